@@ -0,0 +1,42 @@
+"""Digest-keyed LRU cache shared by the code assistant and the evo solver.
+
+Results derived from a piece of source (parse checks, lint output,
+suggestions, execution results) are keyed on a short BLAKE2b digest of
+that source rather than the source itself, so a cache never keeps large
+sources alive. Keep this module next to the scripts that import it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+
+def source_key(code: str) -> bytes:
+    """Cheap content key; collision resistance is not needed here."""
+    return hashlib.blake2b(code.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class DigestCache:
+    """Tiny LRU keyed on source digests, so cached results never pin the source."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[bytes, Any] = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: bytes, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def items(self) -> List[Tuple[bytes, Any]]:
+        """Entries from least to most recently used, so put() in order restores them."""
+        return list(self._data.items())
@@ -0,0 +1,473 @@
+"""Warm interpreter pool for the interactive snippet assistant.
+
+Booting a fresh ``python -I -B`` for every snippet costs tens of
+milliseconds before the snippet even starts. This module keeps a few
+long-lived "runner" interpreters around instead. Each runner is a small
+fork server: for every job it forks a child, applies the resource limits
+in that child, runs the snippet there and reports exit status and
+captured output back over its stdin/stdout as one JSON line per message.
+
+Snippets therefore still get a fresh process (and fresh rlimits) each
+time, only interpreter start-up is skipped. POSIX only; ``run_snippet``
+returns ``None`` when the pool can't be used so callers fall back to a
+cold subprocess.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import select
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Source of the runner process. Kept free of newer syntax because it runs
+# under whatever interpreter ``--python-exe`` points at.
+RUNNER_SRC = r'''
+import json, os, selectors, signal, sys, time
+
+# How often a job checks whether its child is gone while the output pipes
+# are still open, and how long it then keeps reading what is left in them
+CHILD_POLL_SECONDS = 0.1
+FINAL_DRAIN_SECONDS = 0.5
+
+def _limits(cpu_seconds, mem_mb):
+    import resource, signal
+    try:
+        if hasattr(resource, "RLIMIT_CPU"):
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+        mem_bytes = mem_mb * 1024 * 1024
+        if hasattr(resource, "RLIMIT_AS"):
+            resource.setrlimit(resource.RLIMIT_AS, (mem_bytes, mem_bytes))
+        if hasattr(resource, "RLIMIT_FSIZE"):
+            resource.setrlimit(resource.RLIMIT_FSIZE,
+                               (16 * 1024 * 1024, 16 * 1024 * 1024))
+        if hasattr(resource, "RLIMIT_NOFILE"):
+            try:
+                cur_soft, cur_hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+                new_soft = min(256, cur_soft if cur_soft !=
+                               resource.RLIM_INFINITY else 256)
+                resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, cur_hard))
+            except Exception:
+                pass
+        signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+    except Exception as e:
+        sys.stderr.write("[warn] Failed to set POSIX limits: %s\n" % e)
+
+def _exit_code(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    sys.stderr.write("%s\n" % (code,))
+    return 1
+
+def _exec_snippet(path, src):
+    import atexit, linecache, threading, traceback, types
+    sys.argv = [path]
+    mod = types.ModuleType("__main__")
+    mod.__file__ = path
+    sys.modules["__main__"] = mod
+    rc = 0
+    try:
+        if src is None:
+            with open(path, "rb") as fh:
+                src = fh.read()
+        code = compile(src, path, "exec")
+        if path.startswith("<"):
+            # No file to read back, so hand tracebacks the source lines the
+            # way a cold run through /proc/self/fd/N gets them
+            text = src.decode("utf-8", "replace") if isinstance(src, bytes) else src
+            linecache.cache[path] = (len(text), None, text.splitlines(True), path)
+        exec(code, mod.__dict__)
+    except SystemExit as e:
+        rc = _exit_code(e.code)
+    except BaseException as e:
+        tb = e.__traceback__
+        # Hide this runner's own frame so tracebacks match `python file.py`.
+        tb = tb.tb_next if tb is not None else None
+        traceback.print_exception(type(e), e, tb)
+        rc = 1
+    main = threading.main_thread()
+    for t in threading.enumerate():
+        if t is not main and not t.daemon:
+            t.join()
+    try:
+        atexit._run_exitfuncs()
+    except SystemExit as e:
+        rc = _exit_code(e.code)
+    return rc
+
+def _child(job, proto_fds, stdin_r, out_w, err_w, close_fds):
+    rc = 1
+    try:
+        for fd in proto_fds:
+            os.close(fd)
+        os.dup2(stdin_r, 0)
+        os.dup2(out_w, 1)
+        os.dup2(err_w, 2)
+        for fd in close_fds:
+            os.close(fd)
+        _limits(job["cpu"], job["mem"])
+        rc = _exec_snippet(job["path"], job.get("src"))
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(rc & 0xFF)
+
+def _send(fd, obj):
+    data = json.dumps(obj).encode("utf-8") + b"\n"
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def _pump(sel, fd, chunks, open_fds):
+    chunk = os.read(fd, 65536)
+    if chunk:
+        chunks[fd].append(chunk)
+    else:
+        sel.unregister(fd)
+        os.close(fd)
+        open_fds.discard(fd)
+
+def _run_job(job, proto_in, proto_out):
+    """Fork one child for ``job``; return False if the client hung up."""
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    stdin_data = job.get("stdin")
+    if stdin_data is None:
+        stdin_r, stdin_w = os.open(os.devnull, os.O_RDONLY), None
+    else:
+        stdin_r, stdin_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        extra = [fd for fd in (stdin_r, stdin_w, out_r, out_w, err_r, err_w)
+                 if fd is not None]
+        _child(job, (proto_in, proto_out), stdin_r, out_w, err_w, extra)
+    os.close(stdin_r)
+    os.close(out_w)
+    os.close(err_w)
+
+    sel = selectors.DefaultSelector()
+    chunks = {out_r: [], err_r: []}
+    sel.register(out_r, selectors.EVENT_READ)
+    sel.register(err_r, selectors.EVENT_READ)
+    sel.register(proto_in, selectors.EVENT_READ)
+    if stdin_w is not None:
+        os.set_blocking(stdin_w, False)
+        feed = memoryview(stdin_data.encode("utf-8"))
+        sel.register(stdin_w, selectors.EVENT_WRITE)
+    client_alive = True
+    open_fds = set(chunks)
+    status = None
+    while open_fds:
+        for key, _ in sel.select(CHILD_POLL_SECONDS):
+            fd = key.fd
+            if fd == stdin_w:
+                try:
+                    feed = feed[os.write(fd, feed[:65536]):]
+                except BrokenPipeError:
+                    feed = feed[:0]
+                if not feed:
+                    sel.unregister(fd)
+                    os.close(fd)
+                    stdin_w = None
+            elif fd == proto_in:
+                # The only message a client sends mid-job is "kill".
+                if not os.read(proto_in, 65536):
+                    client_alive = False
+                    sel.unregister(fd)
+                os.kill(pid, signal.SIGKILL)
+            else:
+                _pump(sel, fd, chunks, open_fds)
+        # A process the snippet started can hold the pipes open long after
+        # the child has exited or been killed, so don't wait for EOF then
+        reaped, wait_status = os.waitpid(pid, os.WNOHANG)
+        if reaped:
+            status = wait_status
+            break
+    if status is None:
+        _, status = os.waitpid(pid, 0)
+    if open_fds:
+        # Take what the child left in the pipes, bounded in case a leftover
+        # process keeps writing to them
+        deadline = time.monotonic() + FINAL_DRAIN_SECONDS
+        while open_fds and time.monotonic() < deadline:
+            ready = [key.fd for key, _ in sel.select(0) if key.fd in open_fds]
+            if not ready:
+                break
+            for fd in ready:
+                _pump(sel, fd, chunks, open_fds)
+        for fd in open_fds:
+            os.close(fd)
+    if stdin_w is not None:
+        os.close(stdin_w)
+    sel.close()
+    if os.WIFSIGNALED(status):
+        rc = -os.WTERMSIG(status)
+    else:
+        rc = os.WEXITSTATUS(status)
+    if client_alive:
+        _send(proto_out, {
+            "returncode": rc,
+            "stdout": b"".join(chunks[out_r]).decode("utf-8", "replace"),
+            "stderr": b"".join(chunks[err_r]).decode("utf-8", "replace"),
+        })
+    return client_alive
+
+def _main():
+    # Ctrl-C in the assistant reaches the whole process group; only the
+    # snippet child should see it.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    proto_in, proto_out = os.dup(0), os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    buf = b""
+    while True:
+        while b"\n" not in buf:
+            chunk = os.read(proto_in, 65536)
+            if not chunk:
+                return
+            buf += chunk
+        line, buf = buf.split(b"\n", 1)
+        msg = json.loads(line.decode("utf-8"))
+        if not isinstance(msg, dict):
+            continue  # late "kill" for a job that already finished
+        if not _run_job(msg, proto_in, proto_out):
+            return
+
+_main()
+'''
+
+# Extra seconds to wait for a runner to report after it was told to kill
+# a timed-out snippet, before the runner itself is discarded.
+KILL_GRACE_SECONDS = 5
+
+
+class SnippetLostError(Exception):
+    """A runner broke after it was sent a job, so the snippet may have run."""
+
+    def __init__(self, timed_out: bool) -> None:
+        super().__init__("runner lost while running a snippet")
+        self.timed_out = timed_out
+
+
+class _Runner:
+    """One warm fork-server interpreter and its line-based JSON channel."""
+
+    def __init__(self, python_exe: str, env: Dict[str, str]) -> None:
+        self.proc = subprocess.Popen(
+            [python_exe, "-I", "-B", "-c", RUNNER_SRC],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            close_fds=True,
+            bufsize=0,
+        )
+        self._out_fd = self.proc.stdout.fileno()  # type: ignore[union-attr]
+        self._buf = bytearray()
+
+    def send(self, obj: Any) -> None:
+        view = memoryview(json.dumps(obj).encode("utf-8") + b"\n")
+        while view:
+            view = view[self.proc.stdin.write(view):]  # type: ignore[union-attr]
+
+    def recv(self, deadline: Optional[float]) -> Dict[str, Any]:
+        """Read one message; raise TimeoutError at ``deadline`` (monotonic)."""
+        start = 0
+        while True:
+            nl = self._buf.find(b"\n", start)
+            if nl != -1:
+                line = bytes(self._buf[:nl])
+                del self._buf[:nl + 1]
+                return json.loads(line.decode("utf-8"))
+            start = len(self._buf)
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError
+            ready, _, _ = select.select([self._out_fd], [], [], remaining)
+            if not ready:
+                raise TimeoutError
+            chunk = os.read(self._out_fd, 65536)
+            if not chunk:
+                raise EOFError("runner exited")
+            self._buf.extend(chunk)
+
+    def run(self, job: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], bool]:
+        """Run one job; return (result message, timed_out).
+
+        Errors while sending the job propagate as they are: nothing has run.
+        Once it is sent, a broken runner raises SnippetLostError instead.
+        """
+        self.send(job)
+        timed_out = False
+        try:
+            try:
+                return self.recv(time.monotonic() + timeout), False
+            except TimeoutError:
+                timed_out = True
+                self.send("kill")
+                return self.recv(time.monotonic() + KILL_GRACE_SECONDS), True
+        except (OSError, EOFError, TimeoutError, ValueError) as e:
+            raise SnippetLostError(timed_out) from e
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()  # type: ignore[union-attr]
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+
+class RunnerPool:
+    """Lazily grown pool of warm runners for one interpreter + environment."""
+
+    def __init__(self, python_exe: str, env: Dict[str, str], size: Optional[int] = None) -> None:
+        self.python_exe = python_exe
+        self.env = dict(env)
+        self.size = size or os.cpu_count() or 1
+        self._idle: "queue.Queue[_Runner]" = queue.Queue()
+        self._all: List[_Runner] = []
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> _Runner:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                runner = _Runner(self.python_exe, self.env)
+                self._all.append(runner)
+                return runner
+        return self._idle.get()
+
+    def _discard(self, runner: _Runner) -> None:
+        with self._lock:
+            if runner in self._all:
+                self._all.remove(runner)
+        runner.close()
+
+    def warm(self, count: int = 1) -> None:
+        """Start up to ``count`` runners ahead of the first job."""
+        with self._lock:
+            while len(self._all) < min(count, self.size):
+                runner = _Runner(self.python_exe, self.env)
+                self._all.append(runner)
+                self._idle.put(runner)
+
+    def run(
+        self,
+        path: str,
+        *,
+        src: Optional[str] = None,
+        timeout: float,
+        stdin_data: Optional[str],
+        cpu_seconds: int,
+        mem_mb: int,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Run the script at ``path`` in a forked child of a warm runner.
+
+        With ``src`` the source is sent inline and ``path`` is only used as
+        the filename in tracebacks.
+
+        Returns the runner's result message (``returncode``, ``stdout``,
+        ``stderr``) and whether the snippet hit ``timeout``. Raises
+        ``OSError`` if the job could not be sent, and ``SnippetLostError`` if
+        the runner broke while running it; that runner is discarded.
+        """
+        job = {"path": path, "src": src, "cpu": cpu_seconds, "mem": mem_mb, "stdin": stdin_data}
+        runner = self._acquire()
+        try:
+            result = runner.run(job, timeout)
+        except BaseException:
+            self._discard(runner)
+            raise
+        self._idle.put(runner)
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            runners, self._all = self._all, []
+        for runner in runners:
+            runner.close()
+
+
+_POOLS: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], RunnerPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def available() -> bool:
+    return os.name == "posix" and hasattr(os, "fork")
+
+
+def get_pool(python_exe: str, env: Dict[str, str]) -> RunnerPool:
+    key = (python_exe, tuple(sorted(env.items())))
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = RunnerPool(python_exe, env)
+        return pool
+
+
+def run_snippet(
+    python_exe: str,
+    env: Dict[str, str],
+    path: str,
+    *,
+    src: Optional[str] = None,
+    timeout: float,
+    stdin_data: Optional[str],
+    cpu_seconds: int,
+    mem_mb: int,
+) -> Optional[Tuple[Dict[str, Any], bool]]:
+    """Run ``path`` on a warm runner, or return ``None`` to request a cold run.
+
+    ``None`` only ever means the snippet did not start. A runner that breaks
+    mid-job yields an empty result instead (a timeout if the job had already
+    timed out), since a cold run would execute the snippet a second time.
+    """
+    if not available():
+        return None
+    try:
+        return get_pool(python_exe, env).run(
+            path,
+            src=src,
+            timeout=timeout,
+            stdin_data=stdin_data,
+            cpu_seconds=cpu_seconds,
+            mem_mb=mem_mb,
+        )
+    except SnippetLostError as e:
+        if e.timed_out:
+            return {"returncode": -9, "stdout": "", "stderr": ""}, True
+        return {
+            "returncode": 1,
+            "stdout": "",
+            "stderr": "The warm interpreter running the snippet exited unexpectedly.\n",
+        }, False
+    except (OSError, EOFError, TimeoutError, ValueError):
+        return None
+
+
+@atexit.register
+def _close_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
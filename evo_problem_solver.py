@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import ast
+import atexit
+import functools
+import hashlib
 import importlib
 import importlib.metadata as im
 import logging
@@ -9,10 +12,13 @@ import re
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, List, Sequence, Tuple
 
+from _digest_cache import DigestCache as _DigestCache, source_key as _source_key  # sits next to this script
+
 # ------------------------------------------------------------------------------
 # Logging
 # ------------------------------------------------------------------------------
@@ -27,6 +33,8 @@ LOG = logging.getLogger(__name__)
 # ------------------------------------------------------------------------------
 MAX_PASSES = 3
 TIMEOUT = 45  # seconds per external call
+PARSE_CACHE_SIZE = 128  # distinct sources whose parse results are kept
+LINT_CACHE_SIZE = 32  # distinct sources whose linter results are kept
 
 # Mandatory base tools
 BASE_PKGS: tuple[str, ...] = (
@@ -49,6 +57,21 @@ LLM_PKGS: tuple[str, ...] = (
 
 REQUIRED_PKGS = BASE_PKGS + LLM_PKGS
 
+# External linters run by `_lint_external`: (argv prefix, Issue.source tag)
+LINTERS: tuple[tuple[tuple[str, ...], str], ...] = (
+    (("ruff", "--quiet"), "ruff"),
+    (("pyright", "-q"), "pyright"),
+    (("bandit", "-q", "-r"), "bandit"),
+)
+
+# LLM prompts
+SOLVE_PROMPT = "Write valid Python that solves the task and output ONLY code:\n\n"
+BATCH_MARKER = "### TASK"
+SOLVE_BATCH_PROMPT = (
+    "Write valid Python that solves each task below. For every task, output "
+    f"the line '{BATCH_MARKER} <number>' followed ONLY by that task's code.\n"
+)
+
 # Env-vars
 LLAMA_MODEL_ENV = "LLAMA_MODEL_PATH"
 GPT4ALL_MODEL_ENV = "GPT4ALL_MODEL_PATH"
@@ -68,9 +91,10 @@ def _ensure_pip() -> None:
         importlib.invalidate_caches()
 
 
-def _install(pkgs: Iterable[str]) -> None:
+def _install(pkgs: Iterable[str]) -> bool:
+    """Install all `pkgs` in one pip run; True if pip succeeded."""
     if not pkgs:
-        return
+        return True
     LOG.info("Installing: %s", ", ".join(pkgs))
     try:
         subprocess.run(
@@ -80,16 +104,46 @@ def _install(pkgs: Iterable[str]) -> None:
         )
     except subprocess.CalledProcessError as err:
         LOG.error("pip install failed: %s", err)
+        return False
+    return True
+
+
+def _bootstrap_stamp() -> Path:
+    """Marker proving REQUIRED_PKGS were present for this interpreter.
+
+    Delete it (or change the package list) to force a fresh check.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    key = hashlib.blake2b(
+        f"{REQUIRED_PKGS!r}{sys.version}{sys.executable}".encode(), digest_size=8
+    ).hexdigest()
+    return Path(base) / "novamind" / f"bootstrap.{key}"
+
+
+@functools.cache
+def _installed_dists() -> frozenset[str]:
+    """Top-level names known to importlib.metadata (walks sys.path once)."""
+    return frozenset(im.packages_distributions())
 
 
 def _bootstrap() -> None:
+    stamp = _bootstrap_stamp()
+    if stamp.exists():
+        return
     _ensure_pip()
-    missing = [
-        p for p in REQUIRED_PKGS if not im.packages_distributions().get(p.split("==")[0])
-    ]
-    if missing:
-        _install(missing)
+    installed = _installed_dists()
+    missing = [p for p in REQUIRED_PKGS if p.split("==")[0] not in installed]
+    ok = _install(missing)
     importlib.invalidate_caches()
+    if ok:
+        try:
+            stamp.parent.mkdir(parents=True, exist_ok=True)
+            stamp.touch()
+        except OSError as err:  # read-only home etc.; just check again next time
+            LOG.debug("cannot write %s: %s", stamp, err)
 
 
 _bootstrap()
@@ -101,7 +155,7 @@ from isort import code as isort_code  # noqa: E402
 # ------------------------------------------------------------------------------
 # Data structures
 # ------------------------------------------------------------------------------
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class Issue:
     line: int
     message: str
@@ -111,47 +165,65 @@ class Issue:
 # Helpers
 # ------------------------------------------------------------------------------
 
+@functools.cache
+def _scratch_dir() -> str | None:
+    """tmpfs for scratch files when the host has one, else the default tempdir."""
+    shm = "/dev/shm"
+    return shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else None
+
+
 def _run_cmd(
-    cmd: Sequence[str], *, inp: str | None = None, timeout: int = TIMEOUT
+    cmd: Sequence[str],
+    *,
+    inp: str | None = None,
+    timeout: int = TIMEOUT,
+    stdout: int = subprocess.PIPE,
+    stderr: int = subprocess.PIPE,
 ) -> subprocess.CompletedProcess[str]:
+    # Streams nobody reads should go to DEVNULL rather than through a pipe.
     return subprocess.run(
         cmd,
         input=inp,
         text=True,
-        capture_output=True,
+        stdout=stdout,
+        stderr=stderr,
         timeout=timeout,
         check=False,
     )
 
 
-def _tmp_transform(code: str, cmd: Sequence[str]) -> str:
-    """Run an external transformer that rewrites a temp file."""
-    try:
-        with tempfile.NamedTemporaryFile("w+", suffix=".py", delete=False) as tf:
-            path = Path(tf.name)
-            tf.write(code)
-            tf.flush()
-        _run_cmd([*cmd, str(path)])
-        return path.read_text("utf-8")
-    except FileNotFoundError:
-        LOG.debug("[%s] missing; skipped", cmd[0])
-        return code
-    finally:
-        try:
-            path.unlink()  # type: ignore[name-defined]
-        except Exception:  # noqa: BLE001
-            pass
-
-
-def _stdin_transform(code: str, cmd: Sequence[str]) -> str:
-    try:
-        res = _run_cmd(cmd, inp=code)
-        return res.stdout or code
-    except FileNotFoundError:
-        LOG.debug("[%s] missing; skipped", cmd[0])
-        return code
-
+def _pipe_transform(code: str, cmds: Sequence[Sequence[str]]) -> str:
+    """Run `code` through stdin/stdout filters in turn, like a shell pipe.
 
+    The code is encoded once and decoded once. A stage that is missing,
+    times out or prints nothing passes its own input on to the next one, so
+    a broken tool never costs the other tools their fixes.
+    """
+    data = code.encode("utf-8")
+    for cmd in cmds:
+        try:
+            res = subprocess.run(
+                cmd,
+                input=data,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                timeout=TIMEOUT,
+                check=False,
+            )
+        except FileNotFoundError:
+            LOG.debug("[%s] missing; skipped", cmd[0])
+            continue
+        except subprocess.TimeoutExpired:
+            LOG.debug("[%s] timed out; skipped", cmd[0])
+            continue
+        if not res.stdout:
+            LOG.debug("[%s] produced no output; skipped", cmd[0])
+            continue
+        data = res.stdout
+    return data.decode("utf-8")
+
+
+@functools.cache
 def _python_target_flag() -> str:
     maj, min_ = sys.version_info[:2]
     return f"--py{maj}{min_}-plus"
@@ -160,104 +232,257 @@ def _python_target_flag() -> str:
 # Fixer pipeline
 # ------------------------------------------------------------------------------
 class _Pipeline:
+    """Fixer chain; use as a context manager to share one scratch file."""
+
     def __init__(self) -> None:
+        # File-based tools rewrite the shared scratch file in place;
+        # stdin-clean tools are fused into one pipe.
         self.steps = [
             ("isort", lambda c: isort_code(c)),
-            ("pyupgrade", lambda c: _tmp_transform(c, ["pyupgrade", _python_target_flag()])),
-            ("refurb", lambda c: _tmp_transform(c, ["refurb", "--apply"])),
-            ("autoflake", lambda c: _stdin_transform(c, ["autoflake", "--remove-unused-variables", "-"])),
+            ("pyupgrade", lambda c: self._tmp_transform(c, ["pyupgrade", _python_target_flag()])),
+            ("refurb", lambda c: self._tmp_transform(c, ["refurb", "--apply"])),
+            ("autoflake|ruff-fix", lambda c: _pipe_transform(c, [
+                ["autoflake", "--remove-unused-variables", "-"],
+                ["ruff", "--fix", "--quiet", "-"],
+            ])),
             ("autopep8", lambda c: autopep8.fix_code(c)),
-            ("ruff-fix", lambda c: _stdin_transform(c, ["ruff", "--fix", "--quiet", "-"]))
         ]
+        self._tmp_path: Path | None = None
+        self._depth = 0
+
+    def __enter__(self) -> _Pipeline:
+        if self._depth == 0:
+            fd, name = tempfile.mkstemp(suffix=".py", dir=_scratch_dir())
+            os.close(fd)
+            self._tmp_path = Path(name)
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._tmp_path is not None:
+            self._tmp_path.unlink(missing_ok=True)
+            self._tmp_path = None
+
+    def _tmp_transform(self, code: str, cmd: Sequence[str]) -> str:
+        """Run an external transformer that rewrites the scratch file in place."""
+        assert self._tmp_path is not None, "_Pipeline used outside its context"
+        self._tmp_path.write_text(code, "utf-8")
+        try:
+            _run_cmd([*cmd, str(self._tmp_path)],
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            LOG.debug("[%s] missing; skipped", cmd[0])
+            return code
+        return self._tmp_path.read_text("utf-8")
 
     def run(self, code: str) -> str:
-        for label, fn in self.steps:
-            new_code = fn(code)
-            if new_code != code:
-                LOG.debug("Applied %s", label)
-            code = new_code
+        with self:
+            for label, fn in self.steps:
+                new_code = fn(code)
+                if new_code != code:
+                    LOG.debug("Applied %s", label)
+                code = new_code
         return code
 
 # ------------------------------------------------------------------------------
 # Analysis
 # ------------------------------------------------------------------------------
 
-def _syntax_check(code: str) -> List[Issue]:
-    try:
-        ast.parse(code)
-        return []
-    except SyntaxError as e:
-        return [Issue(e.lineno or 0, e.msg, "syntax")]
+_PARSE_CACHE = _DigestCache(PARSE_CACHE_SIZE)
 
 
-def _runtime_check(code: str) -> List[Issue]:
-    try:
-        compile(code, "<string>", "exec")
-        return []
-    except Exception as e:  # noqa: BLE001
-        return [Issue(getattr(e, "lineno", 0) or 0, f"{type(e).__name__}: {e}", "runtime")]
+def _parse_check(code: str) -> List[Issue]:
+    """Syntax and runtime (compile-time) issues for `code`, parsed once.
+
+    The AST from the syntax pass is what gets compiled, so the source is
+    only tokenised and parsed a single time.
+    """
+    key = _source_key(code)
+    cached = _PARSE_CACHE.get(key)
+    if cached is None:
+        try:
+            tree = compile(code, "<string>", "exec", ast.PyCF_ONLY_AST)
+        except SyntaxError as e:
+            # Compiling the source would fail the same way; report it as both.
+            cached = (
+                Issue(e.lineno or 0, e.msg, "syntax"),
+                Issue(e.lineno or 0, f"{type(e).__name__}: {e}", "runtime"),
+            )
+        except Exception as e:  # noqa: BLE001  (e.g. ValueError on NUL bytes)
+            cached = (Issue(0, f"{type(e).__name__}: {e}", "runtime"),)
+        else:
+            try:
+                compile(tree, "<string>", "exec")
+                cached = ()
+            except Exception as e:  # noqa: BLE001
+                cached = (Issue(getattr(e, "lineno", 0) or 0, f"{type(e).__name__}: {e}", "runtime"),)
+        _PARSE_CACHE.put(key, cached)
+    return list(cached)  # type: ignore[arg-type]
+
+
+def _parse_lint_output(out: bytes, tag: str, issues: list[Issue]) -> None:
+    """Append `path:line[:col]: message` records from raw linter stdout.
+
+    Works on bytes and only decodes the message of lines whose line field
+    is numeric, so the bulk of noisy output is never turned into str.
+    """
+    for line in out.split(b"\n"):
+        i1 = line.find(b":")
+        if i1 == -1:
+            continue
+        i2 = line.find(b":", i1 + 1)
+        if i2 == -1:
+            continue
+        lineno = line[i1 + 1:i2]
+        if not lineno.isdigit():
+            continue
+        i3 = line.find(b":", i2 + 1)
+        msg = line[i3 + 1:] if i3 != -1 else line[i2 + 1:]
+        issues.append(Issue(int(lineno), msg.strip().decode("utf-8", "replace"), tag))
 
 
 def _lint_external(code: str) -> List[Issue]:
-    tmp = Path(tempfile.mkstemp(suffix=".py")[1])
-    tmp.write_text(code, "utf-8")
+    """Run all linters concurrently on one temp file and merge their issues."""
+    fd, name = tempfile.mkstemp(suffix=".py", dir=_scratch_dir())
+    tmp = Path(name)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(code)
     issues: list[Issue] = []
 
-    def capture(cmd: Sequence[str], tag: str) -> None:
+    def capture(cmd: Sequence[str], tag: str) -> tuple[str, bytes]:
+        # Workers only read `tmp`; parsing happens back on the calling thread.
         try:
-            out = _run_cmd([*cmd, str(tmp)]).stdout
-            for line in out.splitlines():
-                parts = line.split(":", 3)
-                if len(parts) >= 3 and parts[1].isdigit():
-                    issues.append(Issue(int(parts[1]), parts[-1].strip(), tag))
+            proc = subprocess.Popen(
+                [*cmd, str(tmp)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
         except FileNotFoundError:
             LOG.debug("[%s] missing; skipped", cmd[0])
+            return tag, b""
+        try:
+            return tag, proc.communicate(timeout=TIMEOUT)[0]
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            LOG.debug("[%s] timed out; skipped", cmd[0])
+            return tag, b""
 
-    capture(["ruff", "--quiet"], "ruff")
-    capture(["pyright", "-q"], "pyright")
-    capture(["bandit", "-q", "-r"], "bandit")
-    tmp.unlink(missing_ok=True)
+    try:
+        with ThreadPoolExecutor(max_workers=len(LINTERS)) as pool:
+            futures = [pool.submit(capture, cmd, tag) for cmd, tag in LINTERS]
+            # Drain in submission order so diagnostics stay deterministic.
+            for fut in futures:
+                tag, out = fut.result()
+                _parse_lint_output(out, tag, issues)
+    finally:
+        tmp.unlink(missing_ok=True)
     return issues
 
+
+_LINT_CACHE = _DigestCache(LINT_CACHE_SIZE)
+
+
+def _lint_cached(code: str) -> List[Issue]:
+    """`_lint_external`, reusing the previous result for an unchanged source."""
+    key = _source_key(code)
+    cached = _LINT_CACHE.get(key)
+    if cached is None:
+        cached = tuple(_lint_external(code))
+        _LINT_CACHE.put(key, cached)
+    return list(cached)  # type: ignore[arg-type]
+
+
 # ------------------------------------------------------------------------------
 # Local LLM orchestration
 # ------------------------------------------------------------------------------
 
+_LOADED_LLMS: list[object] = []
+
+
+def _keep_loaded(llm: object) -> object:
+    _LOADED_LLMS.append(llm)
+    return llm
+
+
+@atexit.register
+def _release_llms() -> None:
+    """Close cached model handles so weights/KV caches are freed cleanly."""
+    while _LOADED_LLMS:
+        close = getattr(_LOADED_LLMS.pop(), "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:  # noqa: BLE001
+                pass
+    for factory in (_llama_instance, _gpt4all_instance, _ctransformers_instance):
+        factory.cache_clear()
+
+
+def _available_threads() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 8
+
+
+@functools.cache
+def _llama_instance(model_path: str) -> object:
+    """Load a llama-cpp model once per process; later prompts reuse the context."""
+    import llama_cpp  # noqa: E402
+    opts = dict(model_path=model_path, n_ctx=4096, n_threads=_available_threads(), n_batch=2048)
+    try:
+        llm = llama_cpp.Llama(**opts, n_ubatch=512)
+    except TypeError:  # llama-cpp-python builds without n_ubatch support
+        llm = llama_cpp.Llama(**opts)
+    return _keep_loaded(llm)
+
+
+@functools.cache
+def _gpt4all_instance(model_path: str) -> object:
+    from gpt4all import GPT4All  # noqa: E402
+    return _keep_loaded(GPT4All(model_path))
+
+
+@functools.cache
+def _ctransformers_instance(model_path: str) -> object:
+    from ctransformers import AutoModelForCausalLM  # noqa: E402
+    return _keep_loaded(AutoModelForCausalLM.from_pretrained(model_path, model_type="llama"))
+
+
 def _solve_with_local_llm(prompt: str) -> str | None:
     """Return code string or None if no local model responded."""
     # 1. llama-cpp
     try:
-        import llama_cpp  # noqa: E402
         model_path = os.getenv(LLAMA_MODEL_ENV)
         if model_path and Path(model_path).is_file():
             LOG.info("Using llama-cpp-python")
-            llm = llama_cpp.Llama(model_path=model_path, n_ctx=4096)
-            out = llm(prompt)["choices"][0]["text"]
+            llm = _llama_instance(model_path)
+            out = llm(prompt)["choices"][0]["text"]  # type: ignore[operator]
             return out
     except Exception as e:  # noqa: BLE001
         LOG.debug("llama-cpp failed: %s", e)
 
     # 2. GPT4All
     try:
-        from gpt4all import GPT4All  # noqa: E402
         model_path = os.getenv(GPT4ALL_MODEL_ENV)
         if model_path and Path(model_path).is_file():
             LOG.info("Using GPT4All-py")
-            with GPT4All(model_path) as m:
-                return m.generate(prompt, max_tokens=1024)
+            m = _gpt4all_instance(model_path)
+            return m.generate(prompt, max_tokens=1024)  # type: ignore[attr-defined]
     except Exception as e:  # noqa: BLE001
         LOG.debug("GPT4All failed: %s", e)
 
     # 3. ctransformers
     try:
-        from ctransformers import AutoModelForCausalLM  # noqa: E402
         model_path = (
             os.getenv(LLAMA_MODEL_ENV) or os.getenv(GPT4ALL_MODEL_ENV)
         )
         if model_path and Path(model_path).is_file():
             LOG.info("Using ctransformers")
-            llm = AutoModelForCausalLM.from_pretrained(model_path, model_type="llama")
-            return llm(prompt)
+            llm = _ctransformers_instance(model_path)
+            return llm(prompt)  # type: ignore[operator]
     except Exception as e:  # noqa: BLE001
         LOG.debug("ctransformers failed: %s", e)
 
@@ -266,11 +491,71 @@ def _solve_with_local_llm(prompt: str) -> str | None:
     if cmd:
         LOG.info("Using $OFFLINE_LLM_CMD")
         try:
-            return _run_cmd(cmd.split(), inp=prompt).stdout
+            return _run_cmd(cmd.split(), inp=prompt, stderr=subprocess.DEVNULL).stdout
         except Exception as e:  # noqa: BLE001
             LOG.error("OFFLINE_LLM_CMD failed: %s", e)
     return None
 
+
+def _in_process_model_configured() -> bool:
+    return any(
+        (path := os.getenv(env)) and Path(path).is_file()
+        for env in (LLAMA_MODEL_ENV, GPT4ALL_MODEL_ENV)
+    )
+
+
+def _solve_batch_with_local_llm(tasks: Sequence[str]) -> list[str | None]:
+    """Answer several task descriptions, amortizing model/process startup.
+
+    In-process models are already warm (see the cached factories), so tasks
+    are fed to them one by one. The $OFFLINE_LLM_CMD pipe is launched once
+    with a batch prompt; if its answer can't be split back into one block
+    per task, each task is retried on its own.
+    """
+    if len(tasks) > 1 and not _in_process_model_configured() and os.getenv(OFFLINE_LLM_CMD_ENV):
+        batched = _solve_with_local_llm(_batch_prompt(tasks))
+        if batched is not None:
+            answers = _split_batch_answer(batched, len(tasks))
+            if answers is not None:
+                return answers
+            LOG.debug("Batch answer lacked %d task markers; retrying per task", len(tasks))
+    return [_solve_with_local_llm(SOLVE_PROMPT + t) for t in tasks]
+
+
+def _batch_prompt(tasks: Sequence[str]) -> str:
+    parts = [SOLVE_BATCH_PROMPT]
+    for n, task in enumerate(tasks, 1):
+        parts.append(f"{BATCH_MARKER} {n}\n{task}\n")
+    return "\n".join(parts)
+
+
+def _split_batch_answer(text: str, count: int) -> list[str | None] | None:
+    chunks = _BATCH_MARKER_RE.split(text)
+    answers: dict[int, str] = {}
+    # chunks = [preamble, n1, body1, n2, body2, ...]
+    for n, body in zip(chunks[1::2], chunks[2::2]):
+        answers.setdefault(int(n), body.strip("\n"))
+    if set(answers) != set(range(1, count + 1)):
+        return None
+    return [answers[n] for n in range(1, count + 1)]
+
+
+_BATCH_MARKER_RE = re.compile(rf"^{re.escape(BATCH_MARKER)} (\d+)[ \t]*$", re.MULTILINE)
+
+_HEURISTIC_RE = re.compile(
+    r"(?P<fmt>\.format\()|(?P<path>os\.path)|(?P<concat>['\"][^'\"\n]*['\"]\s*\+|\+\s*['\"])",
+    re.MULTILINE,
+)
+# group -> (priority, hint); one hint per line, lowest priority number wins
+_HEURISTIC_HINTS: dict[str, tuple[int, str]] = {
+    "fmt": (0, "Use f-string"),
+    "path": (1, "Use pathlib"),
+    "concat": (2, "Use f-string"),
+}
+
+# Runs `_heuristics` while the pipeline waits on its subprocesses.
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="heuristics")
+
 # ------------------------------------------------------------------------------
 # Main solver class
 # ------------------------------------------------------------------------------
@@ -281,11 +566,7 @@ class PythonProblemSolver:
 
     # --------------- public --------------- #
     def solve_problem(self, description: str) -> str:
-        prompt = (
-            "Write valid Python that solves the task and output ONLY code:\n\n"
-            + description
-        )
-        result = _solve_with_local_llm(prompt)
+        result = _solve_with_local_llm(SOLVE_PROMPT + description)
         if result is None:
             raise RuntimeError(
                 "No local LLM available.  Install llama-cpp-python or set "
@@ -293,24 +574,42 @@ class PythonProblemSolver:
             )
         return self._postprocess(result)
 
+    def solve_problems(self, descriptions: Sequence[str]) -> List[str]:
+        results = _solve_batch_with_local_llm(list(descriptions))
+        if any(r is None for r in results):
+            raise RuntimeError(
+                "No local LLM available.  Install llama-cpp-python or set "
+                f"{OFFLINE_LLM_CMD_ENV}."
+            )
+        return [self._postprocess(r) for r in results]  # type: ignore[arg-type]
+
     def repair_code(self, code: str) -> Tuple[str, List[Issue]]:
         code = self._preprocess(code)
-        for _ in range(MAX_PASSES):
-            diag = self._diagnose(code)
-            if not any(i.source == "runtime" for i in diag):
-                break
-            code = self.pipeline.run(code)
-        return self._postprocess(code), self._diagnose(code)
+        diag = self._diagnose_fast(code)
+        with self.pipeline:
+            for _ in range(MAX_PASSES):
+                if not any(i.source == "runtime" for i in diag):
+                    break
+                code = self.pipeline.run(code)
+                diag = self._diagnose_fast(code)
+        return self._postprocess(code), self._diagnose_full(code, diag)
 
     def upgrade_code(self, code: str) -> Tuple[str, dict[int, str]]:
-        code = self.pipeline.run(self._preprocess(code))
-        return self._postprocess(code), self._heuristics(code)
+        code = self._preprocess(code)
+        # Hints describe the input: the pipeline removes the very sites the
+        # heuristics look for.
+        hints = _EXECUTOR.submit(self._heuristics, code)
+        with self.pipeline:
+            code = self.pipeline.run(code)
+        return self._postprocess(code), hints.result()
 
     # --------------- helpers --------------- #
     def _preprocess(self, code: str) -> str:
-        if self.strip:
-            code = re.sub(r"[^\x00-\x7F]+", "", code)
-        return code.replace("\r\n", "\n")
+        if not self.strip or code.isascii():
+            return code.replace("\r\n", "\n")
+        # The ASCII codec's "ignore" handler drops every non-ASCII code point
+        # (lone surrogates included) in a single C pass over the str.
+        return code.encode("ascii", "ignore").decode("ascii").replace("\r\n", "\n")
 
     @staticmethod
     def _postprocess(code: str) -> str:
@@ -318,19 +617,30 @@ class PythonProblemSolver:
 
     @staticmethod
     def _heuristics(code: str) -> dict[int, str]:
-        hints: dict[int, str] = {}
-        for n, line in enumerate(code.splitlines(), 1):
-            if ".format(" in line:
-                hints[n] = "Use f-string"
-            elif "os.path" in line:
-                hints[n] = "Use pathlib"
-            elif "+" in line and any(q in line for q in ('"', "'")):
-                hints[n] = "Use f-string"
-        return hints
+        # One regex pass over the whole source. Matches arrive in order, so
+        # the line number advances by the newlines since the previous match.
+        best: dict[int, tuple[int, str]] = {}
+        n, pos = 1, 0
+        for m in _HEURISTIC_RE.finditer(code):
+            start = m.start()
+            n += code.count("\n", pos, start)
+            pos = start
+            rank, hint = _HEURISTIC_HINTS[m.lastgroup]  # type: ignore[index]
+            if n not in best or rank < best[n][0]:
+                best[n] = (rank, hint)
+        return {n: hint for n, (_, hint) in sorted(best.items())}
+
+    @staticmethod
+    def _diagnose_fast(code: str) -> List[Issue]:
+        # In-process checks only; the repair loop needs nothing more.
+        return _parse_check(code)
 
     @staticmethod
-    def _diagnose(code: str) -> List[Issue]:
-        return _syntax_check(code) + _runtime_check(code) + _lint_external(code)
+    def _diagnose_full(code: str, fast: List[Issue] | None = None) -> List[Issue]:
+        # `fast` is a _diagnose_fast result for this same `code`, if one exists.
+        if fast is None:
+            fast = _parse_check(code)
+        return fast + _lint_cached(code)
 
 # ------------------------------------------------------------------------------
 # CLI
@@ -342,7 +652,9 @@ def _cli() -> None:
     pa = argparse.ArgumentParser(prog="evo-problem-solver")
     sub = pa.add_subparsers(dest="cmd", required=True)
 
-    s0 = sub.add_parser("solve");   s0.add_argument("desc")
+    s0 = sub.add_parser("solve");   s0.add_argument("desc", nargs="?")
+    s0.add_argument("--batch", type=argparse.FileType("r", encoding="utf-8"), metavar="FILE",
+                    help="solve one task per non-empty line of FILE ('-' for stdin)")
     s1 = sub.add_parser("repair");  s1.add_argument("file", type=Path); s1.add_argument("--inplace", action="store_true")
     s2 = sub.add_parser("upgrade"); s2.add_argument("file", type=Path); s2.add_argument("--inplace", action="store_true")
 
@@ -350,7 +662,15 @@ def _cli() -> None:
     solver = PythonProblemSolver()
 
     if a.cmd == "solve":
-        print(solver.solve_problem(a.desc))
+        if a.batch is None:
+            if a.desc is None:
+                pa.error("solve: give a task description or --batch FILE")
+            print(solver.solve_problem(a.desc))
+            return
+        tasks = [line.strip() for line in a.batch if line.strip()]
+        for n, code in enumerate(solver.solve_problems(tasks), 1):
+            print(f"# --- task {n}: {tasks[n - 1]}")
+            print(code)
         return
 
     text = a.file.read_text("utf-8")
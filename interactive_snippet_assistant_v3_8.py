@@ -20,6 +20,8 @@ VERSION = "3.8.0"
 
 # Precompile for faster and more reliable error-type extraction
 ERROR_LINE_RE = re.compile(r"^([A-Za-z_][\w\.]*):\s*(.*)$")
+# Tracebacks end with the error line; look no further back than this
+ERROR_SCAN_LINES = 8
 
 
 def _posix_preexec(cpu_seconds: int, mem_mb: int):
@@ -58,15 +60,80 @@ def _posix_preexec(cpu_seconds: int, mem_mb: int):
 
 
 def _parse_error_fields(stderr_text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Find the ``Type: message`` line of a traceback, scanning from the end.
+
+    Only the last ERROR_SCAN_LINES lines are inspected, so runaway stderr
+    from a snippet is never split into a full line list.
+    """
     if not stderr_text:
         return None, None
-    for raw in reversed(stderr_text.strip().splitlines()):
-        m = ERROR_LINE_RE.match(raw.strip())
+    s = stderr_text
+    # Trim trailing whitespace by index; rstrip() would copy the whole text.
+    end = len(s)
+    while end and s[end - 1].isspace():
+        end -= 1
+    for _ in range(ERROR_SCAN_LINES):
+        if end <= 0:
+            break
+        start = s.rfind("\n", 0, end) + 1
+        m = ERROR_LINE_RE.match(s[start:end].strip())
         if m:
             return m.group(1), m.group(2)
+        end = start - 1
     return None, None
 
 
+_IMPORT_SUGGESTION = (
+    "Suggestion: Required module not found. Install missing dependencies and check virtual environments."
+)
+
+# error type -> suggestion text appended after the error header
+_SUGGESTIONS: Dict[str, str] = {
+    "SyntaxError": (
+        "Suggestion: Check for typos, missing colons, incorrect indentation, or unclosed parentheses/brackets/quotes."
+    ),
+    "NameError": (
+        "Suggestion: A variable or function was used before being defined or is misspelled."
+    ),
+    "TypeError": (
+        "Suggestion: Incompatible data types were used together. Verify variable types before operations."
+    ),
+    "IndentationError": (
+        "Suggestion: Python relies on consistent indentation. Ensure spaces/tabs are correct."
+    ),
+    "ImportError": _IMPORT_SUGGESTION,
+    "ModuleNotFoundError": _IMPORT_SUGGESTION,
+    "ZeroDivisionError": "Suggestion: Ensure divisors are not zero before dividing.",
+    "KeyError": "Suggestion: Accessing missing dict key. Use dict.get() or verify the key exists.",
+    "IndexError": "Suggestion: Sequence index is out of range or negative. Check length before accessing.",
+    "AttributeError": (
+        "An attribute or method is missing on an object. Double-check the object's type and available attributes (dir(obj))."
+    ),
+    "ValueError": (
+        "A function received a value of correct type but invalid content. Validate inputs before using them."
+    ),
+    "FileNotFoundError": (
+        "The file path does not exist. Check working directory and use absolute paths if necessary."
+    ),
+    "RecursionError": (
+        "Maximum recursion depth exceeded. Convert deep recursion to iteration or increase the limit cautiously via sys.setrecursionlimit()."
+    ),
+    "MemoryError": (
+        "The operation ran out of memory. Process data in chunks, use generators, or increase limits."
+    ),
+    "OSError": (
+        "An OS-level error occurred (permissions, missing resources, etc.). Log e.errno and e.strerror for details."
+    ),
+    "TimeoutExpired": (
+        "The code took too long. Consider optimizing or increasing the timeout. If the snippet waits on input(), pass --stdin-data or remove blocking reads."
+    ),
+}
+_DEFAULT_SUGGESTION = "Suggestion: Review the traceback to identify where the error occurred."
+_DOCS_FOOTER = (
+    "\n\nFor more details, see the Python docs: https://docs.python.org/3/reference/index.html"
+)
+
+
 def error_correct_code_suggestion(execution_result: Dict[str, Any]) -> str:
     """Return a suggestion message based on captured error info."""
 
@@ -76,68 +143,8 @@ def error_correct_code_suggestion(execution_result: Dict[str, Any]) -> str:
     error_type = execution_result.get("error_type")
     error_message = execution_result.get("error_message", "")
     suggestion = f"Error Type: **{error_type}**\nError Message: {error_message}\n\n"
-
-    if error_type == "SyntaxError":
-        suggestion += (
-            "Suggestion: Check for typos, missing colons, incorrect indentation, or unclosed parentheses/brackets/quotes."
-        )
-    elif error_type == "NameError":
-        suggestion += (
-            "Suggestion: A variable or function was used before being defined or is misspelled."
-        )
-    elif error_type == "TypeError":
-        suggestion += (
-            "Suggestion: Incompatible data types were used together. Verify variable types before operations."
-        )
-    elif error_type == "IndentationError":
-        suggestion += (
-            "Suggestion: Python relies on consistent indentation. Ensure spaces/tabs are correct."
-        )
-    elif error_type in {"ImportError", "ModuleNotFoundError"}:
-        suggestion += (
-            "Suggestion: Required module not found. Install missing dependencies and check virtual environments."
-        )
-    elif error_type == "ZeroDivisionError":
-        suggestion += "Suggestion: Ensure divisors are not zero before dividing."
-    elif error_type == "KeyError":
-        suggestion += "Suggestion: Accessing missing dict key. Use dict.get() or verify the key exists."
-    elif error_type == "IndexError":
-        suggestion += "Suggestion: Sequence index is out of range or negative. Check length before accessing."
-    elif error_type == "AttributeError":
-        suggestion += (
-            "An attribute or method is missing on an object. Double-check the object's type and available attributes (dir(obj))."
-        )
-    elif error_type == "ValueError":
-        suggestion += (
-            "A function received a value of correct type but invalid content. Validate inputs before using them."
-        )
-    elif error_type == "FileNotFoundError":
-        suggestion += (
-            "The file path does not exist. Check working directory and use absolute paths if necessary."
-        )
-    elif error_type == "RecursionError":
-        suggestion += (
-            "Maximum recursion depth exceeded. Convert deep recursion to iteration or increase the limit cautiously via sys.setrecursionlimit()."
-        )
-    elif error_type == "MemoryError":
-        suggestion += (
-            "The operation ran out of memory. Process data in chunks, use generators, or increase limits."
-        )
-    elif error_type == "OSError":
-        suggestion += (
-            "An OS-level error occurred (permissions, missing resources, etc.). Log e.errno and e.strerror for details."
-        )
-    elif error_type == "TimeoutExpired":
-        suggestion += (
-            "The code took too long. Consider optimizing or increasing the timeout. If the snippet waits on input(), pass --stdin-data or remove blocking reads."
-        )
-    else:
-        suggestion += "Suggestion: Review the traceback to identify where the error occurred."
-
-    suggestion += (
-        "\n\nFor more details, see the Python docs: https://docs.python.org/3/reference/index.html"
-    )
-    return suggestion
+    suggestion += _SUGGESTIONS.get(error_type, _DEFAULT_SUGGESTION)
+    return suggestion + _DOCS_FOOTER
 
 
 def execute_in_subprocess(
@@ -24,10 +24,26 @@ except ImportError:  # noqa: WPS440
     AUTOPEP8_AVAILABLE = False
     autopep8 = None
 
+try:
+    import _runner_pool  # warm interpreters; sits next to this script
+except ImportError:  # noqa: WPS440
+    _runner_pool = None
+
 VERSION = "3.9.0"
 
 # Precompile for faster and more reliable error-type extraction
 ERROR_LINE_RE = re.compile(r"^([A-Za-z_][\w\.]*):\s*(.*)$")
+# Tracebacks end with the error line; look no further back than this
+ERROR_SCAN_LINES = 8
+
+# Fixed part of the child environment; PATH is added per call
+_BASE_ENV = {
+    "PYTHONIOENCODING": "utf-8",
+    "PYTHONNOUSERSITE": "1",
+    "PYTHONDONTWRITEBYTECODE": "1",
+    "LC_ALL": "C.UTF-8",
+    "LANG": "C.UTF-8",
+}
 
 
 def _posix_preexec(cpu_seconds: int, mem_mb: int):
@@ -66,15 +82,80 @@ def _posix_preexec(cpu_seconds: int, mem_mb: int):
 
 
 def _parse_error_fields(stderr_text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Find the ``Type: message`` line of a traceback, scanning from the end.
+
+    Only the last ERROR_SCAN_LINES lines are inspected, so runaway stderr
+    from a snippet is never split into a full line list.
+    """
     if not stderr_text:
         return None, None
-    for raw in reversed(stderr_text.strip().splitlines()):
-        m = ERROR_LINE_RE.match(raw.strip())
+    s = stderr_text
+    # Trim trailing whitespace by index; rstrip() would copy the whole text.
+    end = len(s)
+    while end and s[end - 1].isspace():
+        end -= 1
+    for _ in range(ERROR_SCAN_LINES):
+        if end <= 0:
+            break
+        start = s.rfind("\n", 0, end) + 1
+        m = ERROR_LINE_RE.match(s[start:end].strip())
         if m:
             return m.group(1), m.group(2)
+        end = start - 1
     return None, None
 
 
+_IMPORT_SUGGESTION = (
+    "Suggestion: Required module not found. Install missing dependencies and check virtual environments."
+)
+
+# error type -> suggestion text appended after the error header
+_SUGGESTIONS: Dict[str, str] = {
+    "SyntaxError": (
+        "Suggestion: Check for typos, missing colons, incorrect indentation, or unclosed parentheses/brackets/quotes."
+    ),
+    "NameError": (
+        "Suggestion: A variable or function was used before being defined or is misspelled."
+    ),
+    "TypeError": (
+        "Suggestion: Incompatible data types were used together. Verify variable types before operations."
+    ),
+    "IndentationError": (
+        "Suggestion: Python relies on consistent indentation. Ensure spaces/tabs are correct."
+    ),
+    "ImportError": _IMPORT_SUGGESTION,
+    "ModuleNotFoundError": _IMPORT_SUGGESTION,
+    "ZeroDivisionError": "Suggestion: Ensure divisors are not zero before dividing.",
+    "KeyError": "Suggestion: Accessing missing dict key. Use dict.get() or verify the key exists.",
+    "IndexError": "Suggestion: Sequence index is out of range or negative. Check length before accessing.",
+    "AttributeError": (
+        "An attribute or method is missing on an object. Double-check the object's type and available attributes (dir(obj))."
+    ),
+    "ValueError": (
+        "A function received a value of correct type but invalid content. Validate inputs before using them."
+    ),
+    "FileNotFoundError": (
+        "The file path does not exist. Check working directory and use absolute paths if necessary."
+    ),
+    "RecursionError": (
+        "Maximum recursion depth exceeded. Convert deep recursion to iteration or increase the limit cautiously via sys.setrecursionlimit()."
+    ),
+    "MemoryError": (
+        "The operation ran out of memory. Process data in chunks, use generators, or increase limits."
+    ),
+    "OSError": (
+        "An OS-level error occurred (permissions, missing resources, etc.). Log e.errno and e.strerror for details."
+    ),
+    "TimeoutExpired": (
+        "The code took too long. Consider optimizing or increasing the timeout. If the snippet waits on input(), pass --stdin-data or remove blocking reads."
+    ),
+}
+_DEFAULT_SUGGESTION = "Suggestion: Review the traceback to identify where the error occurred."
+_DOCS_FOOTER = (
+    "\n\nFor more details, see the Python docs: https://docs.python.org/3/reference/index.html"
+)
+
+
 def error_correct_code_suggestion(execution_result: Dict[str, Any]) -> str:
     """Return a suggestion message based on captured error info."""
 
@@ -84,68 +165,81 @@ def error_correct_code_suggestion(execution_result: Dict[str, Any]) -> str:
     error_type = execution_result.get("error_type")
     error_message = execution_result.get("error_message", "")
     suggestion = f"Error Type: **{error_type}**\nError Message: {error_message}\n\n"
+    suggestion += _SUGGESTIONS.get(error_type, _DEFAULT_SUGGESTION)
+    return suggestion + _DOCS_FOOTER
 
-    if error_type == "SyntaxError":
-        suggestion += (
-            "Suggestion: Check for typos, missing colons, incorrect indentation, or unclosed parentheses/brackets/quotes."
-        )
-    elif error_type == "NameError":
-        suggestion += (
-            "Suggestion: A variable or function was used before being defined or is misspelled."
-        )
-    elif error_type == "TypeError":
-        suggestion += (
-            "Suggestion: Incompatible data types were used together. Verify variable types before operations."
-        )
-    elif error_type == "IndentationError":
-        suggestion += (
-            "Suggestion: Python relies on consistent indentation. Ensure spaces/tabs are correct."
-        )
-    elif error_type in {"ImportError", "ModuleNotFoundError"}:
-        suggestion += (
-            "Suggestion: Required module not found. Install missing dependencies and check virtual environments."
-        )
-    elif error_type == "ZeroDivisionError":
-        suggestion += "Suggestion: Ensure divisors are not zero before dividing."
-    elif error_type == "KeyError":
-        suggestion += "Suggestion: Accessing missing dict key. Use dict.get() or verify the key exists."
-    elif error_type == "IndexError":
-        suggestion += "Suggestion: Sequence index is out of range or negative. Check length before accessing."
-    elif error_type == "AttributeError":
-        suggestion += (
-            "An attribute or method is missing on an object. Double-check the object's type and available attributes (dir(obj))."
-        )
-    elif error_type == "ValueError":
-        suggestion += (
-            "A function received a value of correct type but invalid content. Validate inputs before using them."
-        )
-    elif error_type == "FileNotFoundError":
-        suggestion += (
-            "The file path does not exist. Check working directory and use absolute paths if necessary."
-        )
-    elif error_type == "RecursionError":
-        suggestion += (
-            "Maximum recursion depth exceeded. Convert deep recursion to iteration or increase the limit cautiously via sys.setrecursionlimit()."
-        )
-    elif error_type == "MemoryError":
-        suggestion += (
-            "The operation ran out of memory. Process data in chunks, use generators, or increase limits."
-        )
-    elif error_type == "OSError":
-        suggestion += (
-            "An OS-level error occurred (permissions, missing resources, etc.). Log e.errno and e.strerror for details."
-        )
-    elif error_type == "TimeoutExpired":
-        suggestion += (
-            "The code took too long. Consider optimizing or increasing the timeout. If the snippet waits on input(), pass --stdin-data or remove blocking reads."
-        )
-    else:
-        suggestion += "Suggestion: Review the traceback to identify where the error occurred."
 
-    suggestion += (
-        "\n\nFor more details, see the Python docs: https://docs.python.org/3/reference/index.html"
+# Label used for runner tracebacks; the source never touches the disk.
+RUNNER_SNIPPET_NAME = "<snippet>"
+
+
+def _write_snippet(src: str) -> Tuple[str, Optional[int]]:
+    """Store the snippet where a child interpreter can open it by path.
+
+    Returns ``(path, fd)``. On Linux the source lives in an anonymous
+    memfd that the child reaches through ``/proc/self/fd/N`` (``fd`` must
+    be passed via ``pass_fds`` and closed afterwards). Elsewhere it is a
+    temp file, on tmpfs (``/dev/shm``) when present; ``fd`` is then None
+    and the caller removes ``path``.
+    """
+    data = src.encode("utf-8")
+    if hasattr(os, "memfd_create") and os.path.isdir("/proc/self/fd"):
+        try:
+            fd = os.memfd_create("snippet")
+        except OSError:
+            pass
+        else:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            return f"/proc/self/fd/{fd}", fd
+    tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+    with tempfile.NamedTemporaryFile("wb", suffix=".py", delete=False, dir=tmp_dir) as tmp:
+        tmp.write(data)
+        return tmp.name, None
+
+
+def _execute_on_runner(
+    python_exe: str,
+    src: str,
+    timeout: int,
+    stdin_data: Optional[str],
+    cpu_seconds: int,
+    mem_mb: int,
+    env: Dict[str, str],
+) -> Optional[Dict[str, Any]]:
+    """Run on a warm pooled interpreter; None means fall back to a cold run."""
+    pooled = _runner_pool.run_snippet(
+        python_exe,
+        env,
+        RUNNER_SNIPPET_NAME,
+        src=src,
+        timeout=timeout,
+        stdin_data=stdin_data,
+        cpu_seconds=cpu_seconds,
+        mem_mb=mem_mb,
     )
-    return suggestion
+    if pooled is None:
+        return None
+    message, timed_out = pooled
+    if timed_out:
+        cmd = [python_exe, "-I", "-B", RUNNER_SNIPPET_NAME]
+        return {
+            "status": "timeout",
+            "stdout": message["stdout"],
+            "stderr": message["stderr"],
+            "error_type": "TimeoutExpired",
+            "error_message": str(subprocess.TimeoutExpired(cmd, timeout)),
+        }
+    stderr = message["stderr"]
+    error_type, error_message = _parse_error_fields(stderr)
+    return {
+        "status": "success" if message["returncode"] == 0 else "error",
+        "stdout": message["stdout"],
+        "stderr": stderr,
+        "error_type": error_type,
+        "error_message": error_message,
+    }
 
 
 def execute_in_subprocess(
@@ -157,20 +251,8 @@ def execute_in_subprocess(
     python_exe: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Run the given code in a separate Python process and capture results."""
-    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False, encoding="utf-8") as tmp:
-        tmp.write(src)
-        tmp_path = tmp.name
-
     python_exe = python_exe or sys.executable
-    cmd = [python_exe, "-I", "-B", tmp_path]
-    env = {
-        "PATH": os.environ.get("PATH", ""),
-        "PYTHONIOENCODING": "utf-8",
-        "PYTHONNOUSERSITE": "1",
-        "PYTHONDONTWRITEBYTECODE": "1",
-        "LC_ALL": "C.UTF-8",
-        "LANG": "C.UTF-8",
-    }
+    env = {**_BASE_ENV, "PATH": os.environ.get("PATH", "")}
 
     kwargs = {
         "stdout": subprocess.PIPE,
@@ -189,6 +271,21 @@ def execute_in_subprocess(
         except Exception:
             stdin_data = stdin_data.decode("utf-8", errors="replace")
 
+    # A snippet run on a warm runner can't inherit our stdin (terminal or
+    # pipe), so runners are only used when its input is given explicitly;
+    # otherwise the cold path passes stdin through. Runners get the source
+    # inline, so no file is written at all.
+    if _runner_pool is not None and stdin_data is not None:
+        pooled = _execute_on_runner(
+            python_exe, src, timeout, stdin_data, cpu_seconds, mem_mb, env)
+        if pooled is not None:
+            return pooled
+
+    tmp_path, src_fd = _write_snippet(src)
+    cmd = [python_exe, "-I", "-B", tmp_path]
+    if src_fd is not None:
+        kwargs["pass_fds"] = (src_fd,)
+
     try:
         proc = subprocess.run(cmd, input=stdin_data, timeout=timeout, **kwargs)
         stdout = proc.stdout
@@ -209,7 +306,10 @@ def execute_in_subprocess(
         }
     finally:
         try:
-            os.remove(tmp_path)
+            if src_fd is not None:
+                os.close(src_fd)
+            else:
+                os.remove(tmp_path)
         except OSError:
             pass
 
@@ -3,435 +3,313 @@
 
 Provides basic execution, formatting, and improvement suggestions for
 Python code. Version 1.2 adds a version flag and optional formatting
-support using autopep8.
+support using ruff, black or autopep8, whichever is installed first.
 """
 
 import io
+import os
 import sys
 import logging
-import argparse
-try:
-    import autopep8
-    AUTOPEP8_AVAILABLE = True
-except ImportError:  # Graceful fallback if autopep8 is missing
-    AUTOPEP8_AVAILABLE = False
-    autopep8 = None
+import atexit
+import contextlib
+import copy
+import shutil
+import threading
+import importlib.util
+import hashlib
+import marshal
+# The optional formatters are only located here, which is cheap; they are
+# imported on first use by _load_formatter(), so importing this module (as the
+# execution worker does) never pays for autopep8/pycodestyle or black. The
+# same goes for json, multiprocessing and subprocess, imported where used.
+AUTOPEP8_AVAILABLE = importlib.util.find_spec("autopep8") is not None
+BLACK_AVAILABLE = importlib.util.find_spec("black") is not None
+autopep8 = None
+black = None
 import ast
-from typing import Dict, Any, List
+import functools
+from collections import defaultdict
+from pathlib import Path
+from types import CodeType
+from typing import DefaultDict, Dict, Any, Final, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from _digest_cache import DigestCache as _DigestCache, source_key as _source_key  # sits next to this script
 
 VERSION = "1.2.0"
 
+# Formatter used for formatting suggestions, picked once: ruff (native, run as
+# a subprocess since it has no Python API), then black, then autopep8.
+RUFF_PATH = shutil.which("ruff")
+if RUFF_PATH:
+    FORMATTER = "ruff"
+elif BLACK_AVAILABLE:
+    FORMATTER = "black"
+elif AUTOPEP8_AVAILABLE:
+    FORMATTER = "autopep8"
+else:
+    FORMATTER = None
+
+# autopep8's options, parsed once (on first use) instead of on every fix_code call
+_AUTOPEP8_OPTIONS = None
+
 # Configure logging to show information messages.
 # This helps in debugging the assistant's own operations.
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+LOG = logging.getLogger(__name__)
 
-# This list contains comprehensive Python knowledge,
+# The knowledge corpus contains comprehensive Python knowledge,
 # ready to be conceptually leveraged by the AI chatbot. It covers
 # foundational concepts, syntax, style, error handling,
 # testing, security, performance, documentation, tooling,
 # and packaging, enabling the AI to perfect its coding skills.
 # In a real-world AI system, this knowledge would be part of the
 # model's training data or dynamically retrieved based on context.
-python_knowledge_corpus: List[Dict[str, str]] = [
-    {
-        "id": "foundations_modular_dry_naming",
-        "content": """
-        ## Foundations: Writing Functional Code
-        Start with clean design principles:
-
-        * **Modular Structure:** Break code into functions and classes for reuse and clarity.
-        * **DRY Principle (“Don’t Repeat Yourself”):** Eliminate duplication; abstract logic into reusable components.
-        * **Descriptive Naming:** Use clear, meaningful names for variables, functions, and modules.
-        """
-    },
-    {
-        "id": "core_syntax_keywords",
-        "content": """
-        ## Core Language Components: Syntax & Keywords
-        Python's fundamental building blocks: if, for, while, class, def, return, yield, global, nonlocal, try, except, finally, raise, import, from, as, lambda, pass, break, continue.
-        """
-    },
-    {
-        "id": "core_built_in_data_types",
-        "content": """
-        ## Core Language Components: Built-in Data Types
-        * **Numeric:** int, float, complex
-        * **Sequence:** list, tuple, range
-        * **Text:** str
-        * **Set types:** set, frozenset
-        * **Mappings:** dict
-        * **Boolean:** bool
-        * **Binary:** bytes, bytearray
-        """
-    },
-    {
-        "id": "core_operators",
-        "content": """
-        ## Core Language Components: Operators
-        * **Arithmetic:** (+, -, *, /, //, %, **)
-        * **Logical:** (and, or, not)
-        * **Comparison:** (==, !=, >, <, >=, <=)
-        * **Assignment:** (=, +=, etc.)
-        * **Identity:** (is, is not)
-        * **Membership:** (in, not in)
-        """
-    },
-    {
-        "id": "core_control_flow",
-        "content": """
-        ## Core Language Components: Control Flow
-        if, elif, else, for loops, while loops, break, continue, pass.
-        Best practices for looping (e.g., using enumerate, zip).
-        """
-    },
-    {
-        "id": "core_exception_handling",
-        "content": """
-        ## Core Language Components: Exception Handling
-        try, except, finally, raise.
-        Specific exception types (ValueError, TypeError, FileNotFoundError, IndexError, KeyError, ZeroDivisionError).
-        Custom exceptions.
-        Best practices for handling exceptions (e.g., catching specific exceptions, logging, re-raising).
-        """
-    },
-    {
-        "id": "core_functions",
-        "content": """
-        ## Core Language Components: Functions
-        Definition (def), lambda expressions, parameters, arguments (positional, keyword, default, *args, **kwargs), return values, yield (for generators), global, nonlocal.
-        **Docstrings (PEP 257)** and **type hints (PEP 484)**.
-        Function purity and side effects.
-        """
-    },
-    {
-        "id": "core_classes_oop",
-        "content": """
-        ## Core Language Components: Classes & OOP
-        class definition, objects, inheritance, super(), **dunder methods** (__init__, __str__, __len__, __call__, etc.), polymorphism, encapsulation, abstraction.
-        Instance vs. class variables, @classmethod, @staticmethod, properties.
-        Design patterns (e.g., Singleton, Factory, Strategy) in Python.
-        """
-    },
-    {
-        "id": "core_modules_imports",
-        "content": """
-        ## Core Language Components: Modules & Imports
-        import, from ... import ..., as keyword, __init__.py, package structure.
-        Structuring larger projects.
-        """
-    },
-    {
-        "id": "standard_library_file_io",
-        "content": """
-        ## Standard Library Modules: File I/O
-        **os**, **io**, **shutil**, **pathlib**.
-        """
-    },
-    {
-        "id": "standard_library_math_numbers",
-        "content": """
-        ## Standard Library Modules: Math & Numbers
-        **math**, **decimal**, **fractions**, **random**.
-        """
-    },
-    {
-        "id": "standard_library_dates_times",
-        "content": """
-        ## Standard Library Modules: Dates & Times
-        **datetime**, **time**, **calendar**.
-        """
-    },
-    {
-        "id": "standard_library_networking",
-        "content": """
-        ## Standard Library Modules: Networking
-        **socket**, **http.client**, **urllib**.
-        """
-    },
-    {
-        "id": "standard_library_data_handling",
-        "content": """
-        ## Standard Library Modules: Data Handling
-        **json**, **csv**, **xml.etree**, **pickle**, **sqlite3**.
-        """
-    },
-    {
-        "id": "standard_library_concurrency",
-        "content": """
-        ## Standard Library Modules: Concurrency
-        **threading**, **multiprocessing**, **asyncio**.
-        """
-    },
-    {
-        "id": "standard_library_testing",
-        "content": """
-        ## Standard Library Modules: Testing
-        **unittest**, **doctest**.
-        """
-    },
-    {
-        "id": "syntax_style_pep8",
-        "content": """
-        ## Syntax & Style: Ensuring Consistency - PEP 8 Compliance
-        Use spaces around operators, indentation (4 spaces), line length (<79 chars).
-        Tools: **black**, **autopep8**, **isort** for formatting and sorting imports.
-        """
-    },
-    {
-        "id": "syntax_style_type_hinting",
-        "content": """
-        ## Syntax & Style: Ensuring Consistency - Type Hinting
-        Helps readability and static analysis: def add(x: int, y: int) -> int.
-        Tools: **mypy**, **pytype**.
-        """
-    },
-    {
-        "id": "error_prevention_validation",
-        "content": """
-        ## Error Prevention & Handling - Validation
-        Validate inputs using assert statements or libraries like **pydantic**.
-        """
-    },
-    {
-        "id": "error_prevention_logging",
-        "content": """
-        ## Error Prevention & Handling - Logging
-        Use the **logging** module to record errors, warnings, and debug info.
-        """
-    },
-    {
-        "id": "testing_unit_frameworks",
-        "content": """
-        ## Testing & Code Quality - Unit Testing
-        Frameworks: **pytest**, **unittest**, **nose2**.
-        Best practices for writing effective unit tests (e.g., independent tests, fast execution, descriptive names, testing edge cases).
-        """
-    },
-    {
-        "id": "testing_coverage",
-        "content": """
-        ## Testing & Code Quality - Test Coverage
-        Use **coverage.py** to evaluate how much of your code is tested.
-        """
-    },
-    {
-        "id": "testing_ci_cd",
-        "content": """
-        ## Testing & Code Quality - CI/CD Integration
-        Automate tests on every change via **GitHub Actions**, **GitLab CI**, etc.
-        """
-    },
-    {
-        "id": "security_static_analysis",
-        "content": """
-        ## Security & Auditing - Static Analysis
-        Scan for vulnerabilities using tools like **bandit**, **safety**, or **pip-audit**.
-        Linters & Type Checkers: **pylint**, **flake8**, **black**, **mypy**.
-        pyflakes for unused variables.
-        """
-    },
-    {
-        "id": "security_dependency_checks",
-        "content": """
-        ## Security & Auditing - Dependency Checks
-        Keep packages up to date; review **CVEs** (Common Vulnerabilities and Exposures) tied to dependencies.
-        """
-    },
-    {
-        "id": "performance_profiling",
-        "content": """
-        ## Performance & Optimization - Profiling
-        Use **cProfile**, **line_profiler** to find bottlenecks.
-        """
-    },
-    {
-        "id": "performance_memory_efficiency",
-        "content": """
-        ## Performance & Optimization - Memory Efficiency
-        Use **generators** where appropriate, avoid unnecessary data copies.
-        """
-    },
-    {
-        "id": "performance_algorithmic_improvements",
-        "content": """
-        ## Performance & Optimization - Algorithmic Improvements
-        Choosing more efficient algorithms and data structures.
-        """
-    },
-    {
-        "id": "performance_vectorization",
-        "content": """
-        ## Performance & Optimization - Vectorization
-        Leveraging optimized C implementations for numerical operations (**NumPy/Pandas**).
-        """
-    },
-    {
-        "id": "performance_concurrency_parallelism",
-        "content": """
-        ## Performance & Optimization - Concurrency and Parallelism
-        * threading (for I/O bound tasks).
-        * multiprocessing (for CPU bound tasks, bypassing GIL).
-        * asyncio (for asynchronous I/O).
-        """
-    },
-    {
-        "id": "documentation_docstrings",
-        "content": """
-        ## Documentation & Comments - Docstrings
-        Add to functions/classes using **NumPy** or **Google style**.
-        """
-    },
-    {
-        "id": "documentation_inline_comments",
-        "content": """
-        ## Documentation & Comments - Inline Comments
-        Explain non-obvious logic or domain-specific decisions.
-        """
-    },
-    {
-        "id": "documentation_readme_api_docs",
-        "content": """
-        ## Documentation & Comments - README & API Docs
-        Use **MkDocs**, **Sphinx**, or **pdoc** for full documentation sets.
-        """
-    },
-    {
-        "id": "tooling_linters",
-        "content": """
-        ## Tooling for Project Health - Linters
-        **flake8**, **pylint**, **ruff** to catch code smells and enforce style.
-        """
-    },
-    {
-        "id": "tooling_virtual_environment",
-        "content": """
-        ## Tooling for Project Health - Virtual Environment
-        Use **venv** or **conda** to isolate dependencies.
-        """
-    },
-    {
-        "id": "tooling_version_control",
-        "content": """
-        ## Tooling for Project Health - Version Control
-        **Git** with branching strategies, semantic commit messages.
-        """
-    },
-    {
-        "id": "packaging_tools",
-        "content": """
-        ## Packaging & Publishing - Packaging Tools
-        **setuptools**, **poetry**, **flit** to build installable Python packages.
-        """
-    },
-    {
-        "id": "packaging_pyproject_toml",
-        "content": """
-        ## Packaging & Publishing - pyproject.toml
-        Modern way to define project metadata and build system.
-        [project] section (name, version, description, dependencies).
-        [build-system] (e.g., setuptools, hatchling).
-        """
-    },
-    {
-        "id": "packaging_building_distribution",
-        "content": """
-        ## Packaging & Publishing - Building Distribution Packages
-        Creating source distributions (.tar.gz) and wheel distributions (.whl).
-        Using python -m build.
-        """
-    },
-    {
-        "id": "packaging_pypi_twine",
-        "content": """
-        ## Packaging & Publishing - Distributing Platforms (PyPI)
-        **PyPI** (Python Package Index) using **twine** to upload packages.
-        """
-    },
-    {
-        "id": "packaging_github",
-        "content": """
-        ## Packaging & Publishing - Distributing Platforms (GitHub)
-        **GitHub** for source control and collaboration.
-        """
-    },
-    {
-        "id": "packaging_ci_cd",
-        "content": """
-        ## Packaging & Publishing - Continuous Integration/Continuous Deployment (CI/CD)
-        Automating testing, building, and publishing workflows (e.g., **GitHub Actions**, **GitLab CI**).
-        """
-    },
-    {
-        "id": "dependency_package_managers",
-        "content": """
-        ## Dependency Management and Installation - Package Managers
-        * **pip**: The standard package installer for Python.
-            * Basic usage: pip install <package_name>.
-            * Installing from requirements.txt: pip install -r requirements.txt.
-            * Upgrading packages: pip install --upgrade <package_name>.
-            * Uninstalling packages: pip uninstall <package_name>.
-        * **conda**: Cross-platform package and environment manager (especially for data science).
-            * Basic usage: conda install <package_name>.
-            * Environment management: conda create -n myenv python=3.9, conda activate myenv.
-        * **poetry**: A dependency management and packaging tool.
-            * Installation: poetry install.
-            * Adding dependencies: poetry add <package_name>.
-        * **pipenv**: Combines pip and virtualenv into a single tool.
-        """
-    },
-    {
-        "id": "dependency_virtual_environments",
-        "content": """
-        ## Dependency Management and Installation - Virtual Environments
-        **Crucial for isolating project dependencies.**
-        Instructions on creating and activating venv or conda environments.
-        Why to always install project-specific libraries within a virtual environment.
-        """
-    },
-    {
-        "id": "dependency_checking_availability",
-        "content": """
-        ## Dependency Management and Installation - Checking for Module Availability
-        Programmatic checks using try-except ImportError.
-        Command-line checks (e.g., pip show <package_name>).
-        """
-    },
-    {
-        "id": "dependency_installation_instructions",
-        "content": """
-        ## Dependency Management and Installation - Including Installation Instructions in Code/Documentation
-        Best practice: Always include a requirements.txt file (or pyproject.toml with dependencies) in your project.
-        Provide clear, step-by-step instructions for users to set up a virtual environment and install dependencies before running any code.
-        """
-    }
-]
+# It lives in knowledge_corpus.json next to this file, a list of
+# {"id": ..., "content": ...} objects, and is only read when first needed.
+CORPUS_PATH = Path(__file__).with_name("knowledge_corpus.json")
 
 
-def interpret_and_execute_code(code_string: str) -> Dict[str, Any]:
+@functools.cache
+def load_corpus() -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
     """
-    Attempts to interpret and execute the given Python code string.
-    Captures stdout and stderr during execution.
+    Reads the knowledge corpus on first use.
 
-    This function demonstrates the 'execution' and initial 'interpretation'
-    of Python code. It's crucial to note that using exec() with untrusted
-    input can be a security risk. For this demonstration, it's used
-    to show code execution and error capture.
+    Returns:
+        Tuple[Tuple[str, ...], Tuple[str, ...]]: Parallel tuples of entry ids
+        and entry contents; contents[i] is the text of the entry ids[i].
+    """
+    import json  # needed once per process, so not imported at startup
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    return (tuple(entry["id"] for entry in entries),
+            tuple(entry["content"] for entry in entries))
 
-    Args:
-        code_string (str): The Python code to execute.
 
-    Returns:
-        Dict[str, Any]: A dictionary containing execution status, captured output,
-                        error details, and error type/message if an error occurred.
+@functools.cache
+def _index() -> Dict[str, int]:
+    """Maps each corpus entry id to its position, built on first lookup."""
+    return {entry_id: position for position, entry_id in enumerate(load_corpus()[0])}
+
+
+def get_entry(entry_id: str) -> str:
+    """
+    Returns the content of the knowledge corpus entry with the given id.
+
+    Raises:
+        KeyError: If there is no entry with that id.
+    """
+    return load_corpus()[1][_index()[entry_id]]
+
+
+def __getattr__(name: str) -> Any:
+    # python_knowledge_corpus, the old list-of-dicts form, built on demand
+    if name == "python_knowledge_corpus":
+        return [{"id": entry_id, "content": content}
+                for entry_id, content in zip(*load_corpus())]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _FdCapture:
+    """
+    Captures everything written to the given file descriptors (1 and 2) by
+    pointing each at a pipe. A single background thread multiplexes the pipes
+    with a selector and drains them into one bytearray per descriptor. Unlike
+    swapping sys.stdout, this also catches output from C extensions and
+    subprocesses that write to the descriptors directly.
+
+    stop() does not wait for the pipes to reach end-of-file: a subprocess the
+    snippet left running holds them open. It takes what has been written so
+    far (see FINAL_DRAIN_SECONDS) and leaves the rest.
+    """
+
+    # Upper bound on the final drain, only reached if a leftover subprocess
+    # keeps writing to the pipes faster than they can be read
+    FINAL_DRAIN_SECONDS = 0.5
+
+    def __init__(self, fds: Tuple[int, ...]) -> None:
+        import selectors
+        self.fds = fds
+        self._buffers = tuple(bytearray() for _ in fds)
+        self._saved_fds = []
+        self._selector = selectors.DefaultSelector()
+        for fd, buffer in zip(fds, self._buffers):
+            read_fd, write_fd = os.pipe()
+            self._saved_fds.append(os.dup(fd))
+            os.dup2(write_fd, fd)
+            os.close(write_fd)
+            self._selector.register(read_fd, selectors.EVENT_READ, buffer)
+        # Written to by stop(), so the drain thread never blocks past it
+        self._wake_read, self._wake_write = os.pipe()
+        self._selector.register(self._wake_read, selectors.EVENT_READ)
+        self._reader = threading.Thread(target=self._drain, daemon=True)
+        self._reader.start()
+
+    def _read(self, key) -> None:
+        chunk = os.read(key.fd, 65536)
+        if chunk:
+            key.data.extend(chunk)
+        else:
+            self._selector.unregister(key.fd)
+            os.close(key.fd)
+
+    def _drain(self) -> None:
+        import time
+        selector = self._selector
+        stopping = False
+        while not stopping and len(selector.get_map()) > 1:
+            for key, _ in selector.select():
+                if key.fd == self._wake_read:
+                    stopping = True
+                else:
+                    self._read(key)
+        # Everything the snippet wrote is in the pipes by now; read what is
+        # there without waiting for an end-of-file that may never come
+        deadline = time.monotonic() + self.FINAL_DRAIN_SECONDS
+        while len(selector.get_map()) > 1 and time.monotonic() < deadline:
+            ready = [key for key, _ in selector.select(0) if key.fd != self._wake_read]
+            if not ready:
+                break
+            for key in ready:
+                self._read(key)
+        for key in list(selector.get_map().values()):
+            if key.fd != self._wake_read:  # closed by stop()
+                os.close(key.fd)
+        selector.close()
+
+    def stop(self) -> Tuple[str, ...]:
+        """Restores the original descriptors and returns the captured texts."""
+        for fd, saved_fd in zip(self.fds, self._saved_fds):
+            os.dup2(saved_fd, fd)  # drops our writer; usually _drain then sees EOF
+            os.close(saved_fd)
+        os.write(self._wake_write, b"\0")
+        self._reader.join()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+        return tuple(buffer.decode("utf-8", errors="replace") for buffer in self._buffers)
+
+
+class _ListIO(io.TextIOBase):
+    """
+    A write-only text stream that keeps each write in a list and joins them
+    once in getvalue(), which is all output capture needs. io.TextIOBase
+    supplies the rest of the file interface (writelines, isatty, close, ...).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.parts: List[str] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if not isinstance(s, str):
+            raise TypeError(f"write() argument must be str, not {type(s).__name__}")
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        self.parts.append(s)
+        return len(s)
+
+    def getvalue(self) -> str:
+        # Still readable after user code closes the stream
+        return "".join(self.parts)
+
+
+# Per-thread (stdout, stderr) pair for the fallback capture, reused across runs
+_capture_buffers = threading.local()
+
+
+def _string_buffers() -> Tuple[_ListIO, _ListIO]:
+    """Returns this thread's (stdout, stderr) buffers, emptied for a new run."""
+    pair = getattr(_capture_buffers, "pair", None)
+    if pair is None or pair[0].closed or pair[1].closed:  # user code may close them
+        pair = _capture_buffers.pair = (_ListIO(), _ListIO())
+    for buffer in pair:
+        buffer.parts.clear()
+    return pair
+
+
+def _fd_capture_supported() -> bool:
+    """
+    True if sys.stdout/sys.stderr are backed by the real descriptors 1 and 2
+    and pipes can be selected on (not on Windows).
+    """
+    if os.name != "posix":
+        return False
+    try:
+        return sys.stdout.fileno() == 1 and sys.stderr.fileno() == 2
+    except (AttributeError, OSError, ValueError):  # io.UnsupportedOperation is an OSError
+        return False
+
+
+class _CompileFailure(NamedTuple):
+    """A cached SyntaxError: enough to raise an identical fresh one."""
+    error_type: type
+    args: tuple
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_cached(code_string: str) -> Union[Any, _CompileFailure]:
+    # Filename stays "<string>", as with exec(str), so error messages don't change
+    try:
+        return compile(code_string, "<string>", "exec")
+    except SyntaxError as e:
+        return _CompileFailure(type(e), e.args)
+
+
+def _compile_user_code(code_string: str):
+    """
+    Compiles code_string once per distinct source, so re-running a snippet
+    skips the parse and compile. Raises SyntaxError as compile() would,
+    including for sources whose failure was cached.
+    """
+    compiled = _compile_cached(code_string)
+    if isinstance(compiled, _CompileFailure):
+        raise compiled.error_type(*compiled.args)
+    return compiled
+
+
+@contextlib.contextmanager
+def _captured_output() -> Iterator[List[str]]:
+    """
+    Captures stdout and stderr for the duration of the with block. The
+    yielded list receives the captured (stdout, stderr) text on exit, once
+    the original streams are restored.
     """
-    # Redirect stdout and stderr to capture output and errors
-    old_stdout = sys.stdout
-    old_stderr = sys.stderr
-    redirected_output = io.StringIO()
-    redirected_error = io.StringIO()
-    sys.stdout = redirected_output
-    sys.stderr = redirected_error
+    captured: List[str] = []
+    if _fd_capture_supported():
+        old_stdout, old_stderr = sys.stdout, sys.stderr
+        # Flush first so nothing already buffered by the assistant is captured
+        old_stdout.flush()
+        old_stderr.flush()
+        capture = _FdCapture((1, 2))
+        try:
+            yield captured
+        finally:
+            old_stdout.flush()
+            old_stderr.flush()
+            captured.extend(capture.stop())
+            # The descriptors are back; also undo any rebinding by user code
+            sys.stdout, sys.stderr = old_stdout, old_stderr
+        return
+    out, err = _string_buffers()
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            yield captured
+    finally:
+        captured.extend((out.getvalue(), err.getvalue()))
+
+
+def _execute_here(code: Union[str, CodeType]) -> Dict[str, Any]:
+    """
+    Executes code (source, or an already compiled code object) in the current
+    process and captures its output. Used by the execution worker, and
+    directly if no worker can be started.
 
+    Output is captured at the file descriptor level when possible, so prints
+    from C extensions are included too; otherwise sys.stdout and sys.stderr
+    are swapped for in-memory buffers.
+    """
     result = {
         "status": "success",
         "output": "",
@@ -440,36 +318,362 @@ def interpret_and_execute_code(code_string: str) -> Dict[str, Any]:
         "error_message": ""
     }
 
+    # Compile before redirecting, so a syntax error needs no capture at all
     try:
-        # Execute the code. Using empty global/local dictionaries for exec
-        # helps to isolate the execution environment and prevent unintended
-        # side effects or access to the script's own variables.
-        exec(code_string, {}, {})
-        result["output"] = redirected_output.getvalue()
+        code_obj = code if isinstance(code, CodeType) else _compile_user_code(code)
     except SyntaxError as e:
         # Catch specific SyntaxError for clearer feedback
         result["status"] = "syntax_error"
-        result["error"] = redirected_error.getvalue()
         result["error_type"] = "SyntaxError"
         result["error_message"] = str(e)
-        logging.error(f"Syntax Error: {e}")
-    except Exception as e:
-        # Catch any other runtime exceptions
-        result["status"] = "runtime_error"
-        result["error"] = redirected_error.getvalue()
-        result["error_type"] = type(e).__name__
-        result["error_message"] = str(e)
-        logging.error(f"Runtime Error ({type(e).__name__}): {e}")
-    finally:
-        # Restore original stdout and stderr
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
-        # Ensure any stderr output is captured even if no specific exception was caught
-        if not result["error"] and redirected_error.getvalue():
-            result["error"] = redirected_error.getvalue()
+        LOG.error("Syntax Error: %s", e)
+        return result
+
+    with _captured_output() as captured:
+        try:
+            # Execute the code in a fresh namespace, isolated from the script's
+            # own variables. One dict serves as globals and locals, as for a
+            # script run directly, so top-level functions can see module names.
+            exec(code_obj, {"__name__": "__main__"})
+        except SyntaxError as e:
+            # Raised at run time, e.g. by eval() or importing a broken module
+            result["status"] = "syntax_error"
+            result["error_type"] = "SyntaxError"
+            result["error_message"] = str(e)
+        except Exception as e:
+            # Catch any other runtime exceptions
+            result["status"] = "runtime_error"
+            result["error_type"] = type(e).__name__
+            result["error_message"] = str(e)
+    output, error = captured
+    if result["status"] == "success":
+        result["output"] = output
+    # Ensure any stderr output is captured even if no specific exception was caught
+    result["error"] = error
+    # Logged only once the real streams are back, so it is not captured
+    if result["status"] == "syntax_error":
+        LOG.error("Syntax Error: %s", result["error_message"])
+    elif result["status"] == "runtime_error":
+        LOG.error("Runtime Error (%s): %s", result["error_type"], result["error_message"])
+    return result
+
+
+# Limits for snippets run by the execution worker
+EXEC_TIMEOUT = 10  # seconds per snippet before the worker is killed and restarted
+EXEC_MEMORY_MB = 512  # address space of the worker process (POSIX only)
+
+
+def _limit_worker_resources() -> None:
+    """Caps the worker's address space, so a runaway snippet gets a MemoryError."""
+    try:
+        import resource
+    except ImportError:  # not POSIX
+        return
+    try:
+        mem_bytes = EXEC_MEMORY_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (mem_bytes, mem_bytes))
+    except (ValueError, OSError) as e:
+        LOG.warning("Could not limit the execution process memory: %s", e)
+
+
+def _worker_main(conn) -> None:
+    """Entry point of the execution worker: run each received snippet, send back its result."""
+    _limit_worker_resources()
+    while True:
+        try:
+            code = conn.recv()
+        except EOFError:  # the assistant has gone away
+            return
+        if isinstance(code, bytes):  # a marshalled code object (see submit)
+            code = marshal.loads(code)
+        conn.send(_execute_here(code))
+
+
+class _ExecutionWorker:
+    """
+    A persistent child process that executes snippets, so user code cannot
+    leak imports or monkey-patches into the assistant and cannot take it
+    down with sys.exit(), a crash or runaway memory use (see EXEC_MEMORY_MB).
+    The worker is started on first use and restarted if a snippet kills it
+    or runs longer than EXEC_TIMEOUT.
+
+    submit() returns immediately, which lets the caller analyse the code
+    while it runs; result() then waits for the outcome.
+    """
+
+    def __init__(self) -> None:
+        self._process = None
+        self._conn = None
+        self._inline_code: Union[str, CodeType, None] = None  # set when no worker could be started
+
+    def _start(self) -> None:
+        # Imported here, so the module (the worker included) starts without it;
+        # the spawned worker loads its own copy while bootstrapping anyway.
+        import multiprocessing
+        # "spawn" gives a clean interpreter regardless of the assistant's own threads.
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self._process.start()
+        child_conn.close()
+
+    def warm_up(self) -> None:
+        """Starts the worker ahead of the first snippet; spawning it takes ~0.1 s."""
+        if self._process is not None and self._process.is_alive():
+            return
+        try:
+            self._start()
+        except OSError as e:  # submit() tries again, and falls back if needed
+            LOG.warning("Could not start the execution process: %s", e)
+            self._process = None
+
+    def submit(self, code: Union[str, CodeType]) -> None:
+        try:
+            if self._process is None or not self._process.is_alive():
+                self._start()
+            # Code objects don't pickle; the worker runs the same interpreter,
+            # so marshal (as used for .pyc files) carries them across
+            self._conn.send(marshal.dumps(code) if isinstance(code, CodeType) else code)
+        except OSError as e:
+            LOG.warning("Could not use the execution process, running in-process: %s", e)
+            self._process = None
+            self._inline_code = code
+
+    def result(self) -> Dict[str, Any]:
+        if self._inline_code is not None:
+            code, self._inline_code = self._inline_code, None
+            return _execute_here(code)
+        try:
+            if not self._conn.poll(EXEC_TIMEOUT):
+                self._process.kill()
+                self._process.join()
+                self._process = None
+                return {
+                    "status": "timeout",
+                    "output": "",
+                    "error": "",
+                    "error_type": "TimeoutError",
+                    "error_message": f"The code did not finish within {EXEC_TIMEOUT} seconds and was stopped.",
+                }
+            result = self._conn.recv()
+        except (EOFError, OSError):
+            # The snippet ended the worker (sys.exit(), os._exit(), a crash...),
+            # or the worker died while starting up (ConnectionResetError).
+            exitcode = None
+            if self._process.pid is not None:  # only a started process can be joined
+                self._process.join()
+                exitcode = self._process.exitcode
+            self._process = None
+            return {
+                "status": "runtime_error",
+                "output": "",
+                "error": "",
+                "error_type": "SystemExit",
+                "error_message": f"The code ended the execution process (exit code {exitcode}).",
+            }
+        # Unpickled strings are fresh copies; interned, the status checks and
+        # the _SUGGESTIONS lookup (whose literal keys are interned) compare by identity
+        result["status"] = sys.intern(result["status"])
+        if result["error_type"] is not None:
+            result["error_type"] = sys.intern(result["error_type"])
+        return result
+
+    def close(self) -> None:
+        if self._process is not None:
+            self._conn.close()
+            if self._process.pid is not None:  # never started: nothing to stop
+                self._process.join(timeout=1)
+                if self._process.is_alive():
+                    self._process.kill()
+            self._process = None
+
+
+_execution_worker = _ExecutionWorker()
+atexit.register(_execution_worker.close)
+
+
+# Execution results of pure snippets (see _is_pure), replayed on resubmission
+EXEC_CACHE_SIZE = 256
+_EXEC_CACHE = _DigestCache(EXEC_CACHE_SIZE)
+# Builtins whose use makes a run depend on, or change, the outside world
+_IMPURE_NAMES = frozenset({
+    "open", "input", "exec", "eval", "compile", "__import__", "breakpoint",
+    "help", "exit", "quit", "globals", "vars", "locals", "id", "hash",
+    "getattr", "setattr", "delattr",
+})
+# The submitted snippet's cache key, or its cached result (see collect_code_execution)
+_pending_key: Optional[bytes] = None
+_pending_result: Optional[Dict[str, Any]] = None
+# Hot snippets, as in a tracing JIT: sources are counted as they are submitted,
+# and once one has been seen HOT_THRESHOLD times its compiled code is kept
+HOT_THRESHOLD = 3
+HOT_CODE_CACHE_SIZE = 128
+_SUBMIT_COUNTS = _DigestCache(HOT_CODE_CACHE_SIZE)
+_HOT_CODE = _DigestCache(HOT_CODE_CACHE_SIZE)
+
+
+def _is_pure(code_string: str) -> bool:
+    """
+    True if running code_string can only depend on its own text: it imports
+    nothing, names none of _IMPURE_NAMES and touches nothing dunder, neither
+    names (__builtins__), attributes nor strings (as passed to getattr or
+    str.format), which are the usual routes from a builtin back to modules.
+    The test is deliberately conservative: a false "pure" replays a stale
+    result. Code that does not parse is pure too, since it always fails the
+    same way.
+    """
+    tree = _parse_cached(code_string)
+    if tree is None:
+        return True
+    for node in ast.walk(tree):
+        node_type = type(node)
+        if node_type is ast.Import or node_type is ast.ImportFrom:
+            return False
+        if node_type is ast.Name and (node.id in _IMPURE_NAMES or node.id.startswith("__")):
+            return False
+        if node_type is ast.Attribute and node.attr.startswith("__"):
+            return False
+        if node_type is ast.Constant and type(node.value) is str and "__" in node.value:
+            return False
+    return True
+
+
+def submit_code_execution(code: Union[str, CodeType], tree: Optional[ast.AST] = None) -> None:
+    """
+    Starts executing code (source or a code object) in the worker process
+    without waiting for it. Every call must be followed by
+    collect_code_execution(). Pure snippets seen before are not run again:
+    their earlier result is replayed. tree, the source's tree from
+    _parse_cached, is compiled here and sent instead of the source, so the
+    worker does not parse the code a second time.
+    """
+    global _pending_key, _pending_result
+    _pending_key = _pending_result = None
+    if isinstance(code, str) and _is_pure(code):
+        _pending_key = _source_key(code)
+        _pending_result = _EXEC_CACHE.get(_pending_key)
+        if _pending_result is not None:
+            return
+    if tree is not None:
+        code = _code_for_worker(code, tree, _pending_key or _source_key(code))
+    _execution_worker.submit(code)
+
+
+def _code_for_worker(code_string: str, tree: ast.AST, key: bytes) -> Union[str, CodeType]:
+    """
+    Returns the compiled tree of code_string (whose _source_key is key), or
+    the source itself if the compiler rejects it, so that the worker reports
+    the error. Hot snippets skip the compile and reuse their kept result.
+    """
+    code = _HOT_CODE.get(key)
+    if code is not None:
+        return code
+    code = _compile_tree(tree) or code_string
+    count = (_SUBMIT_COUNTS.get(key) or 0) + 1
+    if count >= HOT_THRESHOLD:
+        _HOT_CODE.put(key, code)
+    else:
+        _SUBMIT_COUNTS.put(key, count)
+    return code
+
+
+def collect_code_execution() -> Dict[str, Any]:
+    """Waits for the snippet passed to submit_code_execution() and returns its result."""
+    global _pending_key, _pending_result
+    key, cached = _pending_key, _pending_result
+    _pending_key = _pending_result = None
+    if cached is not None:
+        return dict(cached)
+    result = _execution_worker.result()
+    # A timeout depends on the machine's load, not just on the code
+    if key is not None and result["status"] != "timeout":
+        _EXEC_CACHE.put(key, dict(result))
     return result
 
 
+def interpret_and_execute_code(code_string: Union[str, CodeType]) -> Dict[str, Any]:
+    """
+    Attempts to interpret and execute the given Python code string.
+    Captures stdout and stderr during execution.
+
+    This function demonstrates the 'execution' and initial 'interpretation'
+    of Python code. It's crucial to note that using exec() with untrusted
+    input can be a security risk. For this demonstration, it's used
+    to show code execution and error capture. The code runs in a separate
+    worker process, so it cannot affect the assistant itself.
+
+    Args:
+        code_string (Union[str, CodeType]): The Python code to execute, as
+            source or as a code object compiled by the caller.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing execution status, captured output,
+                        error details, and error type/message if an error occurred.
+    """
+    submit_code_execution(code_string)
+    return collect_code_execution()
+
+
+_IMPORT_SUGGESTION = (
+    "Suggestion: A required module or library is not found. Ensure it is installed in your environment (e.g., pip install <module_name>). If using a virtual environment, make sure it's activated."
+)
+
+# Error type -> suggestion shown after the error header
+_SUGGESTIONS: Dict[str, str] = {
+    "SyntaxError": (
+        "Suggestion: Check for typos, missing colons, incorrect indentation, or unclosed parentheses/brackets/quotes. Pay attention to the line indicated in the error message."
+    ),
+    "NameError": (
+        "Suggestion: A variable or function was used before it was defined, or it's misspelled. Ensure all names are correctly spelled and in scope. Remember Python is case-sensitive!"
+    ),
+    "TypeError": (
+        "Suggestion: An operation was attempted on an incompatible data type (e.g., trying to add a string to an integer). Check the types of your variables before operations. Consider using type hints (def func(arg: int) -> str:) for clarity."
+    ),
+    "AttributeError": (
+        "Suggestion: An attribute or method is missing on an object. Double-check the object's type and available attributes (dir(obj))."
+    ),
+    "ValueError": (
+        "Suggestion: A function received a value of correct type but invalid content. Validate inputs before using them."
+    ),
+    "FileNotFoundError": (
+        "Suggestion: The file path does not exist. Check your working directory and ensure the path is correct."
+    ),
+    "RecursionError": (
+        "Suggestion: Maximum recursion depth exceeded. Convert deep recursion to iteration or increase the limit via sys.setrecursionlimit() with care."
+    ),
+    "MemoryError": (
+        "Suggestion: The operation ran out of memory. Process data in chunks, use generators, or optimize your algorithm."
+    ),
+    "OSError": (
+        "Suggestion: An OS-level error occurred (permissions, missing resources, etc.). Inspect e.errno and e.strerror for more details."
+    ),
+    "IndentationError": (
+        "Suggestion: Python relies heavily on consistent indentation (usually 4 spaces per level). Ensure your code blocks (e.g., after if, for, def, class) have correct and uniform indentation."
+    ),
+    "ImportError": _IMPORT_SUGGESTION,
+    "ModuleNotFoundError": _IMPORT_SUGGESTION,
+    "ZeroDivisionError": (
+        "Suggestion: You attempted to divide by zero. Add a check (e.g., an if statement) to ensure the divisor is not zero before performing division."
+    ),
+    "TimeoutError": (
+        "Suggestion: The code took too long to run. Look for infinite loops, unbounded recursion or blocking calls (input(), network access), and test with smaller inputs first."
+    ),
+    "KeyError": (
+        "Suggestion: You tried to access a dictionary key that does not exist. Double-check the key's spelling or use dict.get() with a default value."
+    ),
+    "IndexError": (
+        "Suggestion: You tried to access an index that is out of the bounds of a list or other sequence. Ensure the index is within the valid range (0 to length-1) and watch for negative indices."
+    ),
+}
+_DEFAULT_SUGGESTION = (
+    "Suggestion: This is a general runtime error. Review the traceback carefully to understand the sequence of calls leading to the error. Consider adding print() statements or using a debugger to inspect variable states. Implement more specific try-except blocks for anticipated errors."
+)
+_HEADER_FMT = "Error Type: **{error_type}**\nError Message: {error_message}\n\n{body}{footer}"
+_FOOTER = (
+    "\n\nFor more in-depth information on specific errors, refer to the official Python Language Reference: [https://docs.python.org/3/reference/index.html](https://docs.python.org/3/reference/index.html)"
+)
+
+
 def error_correct_code_suggestion(execution_result: Dict[str, Any]) -> str:
     """
     Provides a basic error correction suggestion based on the execution result.
@@ -489,224 +693,808 @@ def error_correct_code_suggestion(execution_result: Dict[str, Any]) -> str:
     error_type = execution_result["error_type"]
     error_message = execution_result["error_message"]
 
-    suggestion = f"Error Type: **{error_type}**\nError Message: {error_message}\n\n"
-
-    # Provide specific suggestions based on common Python error types
-    if error_type == "SyntaxError":
-        suggestion += "Suggestion: Check for typos, missing colons, incorrect indentation, or unclosed parentheses/brackets/quotes. Pay attention to the line indicated in the error message."
-    elif error_type == "NameError":
-        suggestion += "Suggestion: A variable or function was used before it was defined, or it's misspelled. Ensure all names are correctly spelled and in scope. Remember Python is case-sensitive!"
-    elif error_type == "TypeError":
-        suggestion += "Suggestion: An operation was attempted on an incompatible data type (e.g., trying to add a string to an integer). Check the types of your variables before operations. Consider using type hints (def func(arg: int) -> str:) for clarity."
-    elif error_type == "AttributeError":
-        suggestion += "Suggestion: An attribute or method is missing on an object. Double-check the object's type and available attributes (dir(obj))."
-    elif error_type == "ValueError":
-        suggestion += "Suggestion: A function received a value of correct type but invalid content. Validate inputs before using them."
-    elif error_type == "FileNotFoundError":
-        suggestion += "Suggestion: The file path does not exist. Check your working directory and ensure the path is correct."
-    elif error_type == "RecursionError":
-        suggestion += "Suggestion: Maximum recursion depth exceeded. Convert deep recursion to iteration or increase the limit via sys.setrecursionlimit() with care."
-    elif error_type == "MemoryError":
-        suggestion += "Suggestion: The operation ran out of memory. Process data in chunks, use generators, or optimize your algorithm."
-    elif error_type == "OSError":
-        suggestion += "Suggestion: An OS-level error occurred (permissions, missing resources, etc.). Inspect e.errno and e.strerror for more details."
-    elif error_type == "IndentationError":
-        suggestion += "Suggestion: Python relies heavily on consistent indentation (usually 4 spaces per level). Ensure your code blocks (e.g., after if, for, def, class) have correct and uniform indentation."
-    elif error_type == "ImportError" or error_type == "ModuleNotFoundError":
-        suggestion += "Suggestion: A required module or library is not found. Ensure it is installed in your environment (e.g., pip install <module_name>). If using a virtual environment, make sure it's activated."
-    elif error_type == "ZeroDivisionError":
-        suggestion += "Suggestion: You attempted to divide by zero. Add a check (e.g., an if statement) to ensure the divisor is not zero before performing division."
-    elif error_type == "KeyError":
-        suggestion += "Suggestion: You tried to access a dictionary key that does not exist. Double-check the key's spelling or use dict.get() with a default value."
-    elif error_type == "IndexError":
-        suggestion += "Suggestion: You tried to access an index that is out of the bounds of a list or other sequence. Ensure the index is within the valid range (0 to length-1) and watch for negative indices."
-    else:
-        suggestion += "Suggestion: This is a general runtime error. Review the traceback carefully to understand the sequence of calls leading to the error. Consider adding print() statements or using a debugger to inspect variable states. Implement more specific try-except blocks for anticipated errors."
+    return _HEADER_FMT.format(
+        error_type=error_type,
+        error_message=error_message,
+        body=_SUGGESTIONS.get(error_type, _DEFAULT_SUGGESTION),
+        footer=_FOOTER,
+    )
 
-    suggestion += "\n\nFor more in-depth information on specific errors, refer to the official Python Language Reference: [https://docs.python.org/3/reference/index.html](https://docs.python.org/3/reference/index.html)"
-    return suggestion
+
+@functools.lru_cache(maxsize=128)
+def _parse_cached(code_string: str) -> Optional[ast.AST]:
+    """
+    Parses code_string once per distinct source, so repeated REPL submissions
+    skip re-parsing. Returns None (also cached) if the code has a syntax error.
+    The returned tree is shared between callers and must not be modified.
+    """
+    try:
+        # Plain AST only: no type comments, and no optimize level, since
+        # optimize=2 would strip the very docstrings being checked for.
+        return ast.parse(code_string, mode="exec", type_comments=False)
+    except SyntaxError:
+        return None
 
 
-def improve_code_suggestion(code_string: str) -> Dict[str, str]:
+def _compile_tree(tree: ast.AST) -> Optional[CodeType]:
+    """
+    Compiles a tree from _parse_cached for execution, or returns None if the
+    compiler rejects it (e.g. 'return' outside a function). The filename is
+    "<string>", as for source, so error messages are the same either way.
+    """
+    try:
+        return compile(tree, "<string>", "exec")
+    except SyntaxError:
+        return None
+
+
+# Reminders included in every improve_code_suggestion result
+_DEPENDENCY_REMINDER: Final[str] = "Remember to manage your project dependencies using a requirements.txt file or a tool like poetry or pipenv. Always install dependencies in a **virtual environment** to avoid conflicts."
+_GENERAL_BEST_PRACTICES: Final[str] = """
+    **General Best Practices Reminders:**
+    * **Modular Structure:** Break code into smaller, reusable functions and classes (**DRY Principle**).
+    * **Descriptive Naming:** Use clear and meaningful names for all identifiers.
+    * **Error Handling:** Use try-except blocks for graceful error management.
+    * **Testing:** Write unit tests (pytest, unittest) and aim for good test coverage (coverage.py).
+    * **Security:** Regularly scan for vulnerabilities (bandit, safety).
+    * **Performance:** Profile your code (cProfile) and optimize algorithms/data structures.
+    * **Documentation:** Maintain clear **docstrings** and **READMEs** for your projects.
+    """
+
+# Suggestion texts, built once; the templates take the function or class name
+_FUNCTION_DOCSTRING_TMPL: Final[str] = "Consider adding a **docstring** to function {name} to explain its purpose, arguments, and return values (e.g., using Google or NumPy style)."
+_TYPE_HINT_TMPL: Final[str] = "Add **type hints** to parameters and the return value of function {name} for better readability and static analysis."
+_CLASS_DOCSTRING_TMPL: Final[str] = "Consider adding a **docstring** to class {name} to explain its purpose."
+_REFACTORING_SUGGESTION: Final[str] = "If you are building a list using a for loop and .append(), consider using a more concise **list comprehension** for better readability and often performance."
+_FILE_HANDLING_SUGGESTION: Final[str] = "When working with files, always use a with open(...) statement. It ensures the file is properly closed even if errors occur, preventing resource leaks."
+_SYNTAX_WARNING: Final[str] = "Could not perform deeper code analysis due to syntax errors. Please fix syntax first."
+_FORMAT_SKIPPED: Final[str] = "Skipped automatic formatting because the code has syntax errors."
+_FORMAT_APPLIED: Final[str] = f"Code has been automatically formatted for **PEP 8 compliance** using {FORMATTER}. Consistent formatting improves readability."
+_FORMAT_UNCHANGED: Final[str] = f"Code already appears to be PEP 8 compliant (no changes by {FORMATTER})."
+_NO_FORMATTER: Final[str] = "No formatter is installed. Install ruff, black or autopep8 for automatic PEP 8 formatting suggestions."
+
+
+def _load_formatter() -> None:
+    """Imports the selected Python formatter the first time it is needed."""
+    global autopep8, black, _AUTOPEP8_OPTIONS
+    if FORMATTER == "black" and black is None:
+        import black
+    elif FORMATTER == "autopep8" and autopep8 is None:
+        import autopep8
+        _AUTOPEP8_OPTIONS = autopep8.parse_args([""], apply_config=False)
+
+
+# Recent formatter outputs (dict used as an insertion-ordered set). Formatting
+# is idempotent, so code found here is already clean and needs no new pass.
+FORMATTED_OUTPUTS_SIZE = 256
+_formatted_outputs: Dict[str, None] = {}
+
+
+@functools.lru_cache(maxsize=128)
+def _format_code(code_string: str) -> str:
+    """
+    Formats code_string with the best available formatter (see FORMATTER).
+    Raises an exception if the formatter rejects the code (failures are not
+    cached). Results are memoised, since resubmitting the same snippet is
+    common and every formatter is deterministic for fixed options.
+    """
+    if code_string in _formatted_outputs:
+        return code_string
+    formatted = _run_formatter(code_string)
+    if len(_formatted_outputs) >= FORMATTED_OUTPUTS_SIZE:
+        del _formatted_outputs[next(iter(_formatted_outputs))]
+    _formatted_outputs[formatted] = None
+    return formatted
+
+
+def _run_formatter(code_string: str) -> str:
+    """Runs the selected formatter on code_string; see _format_code."""
+    if FORMATTER == "ruff":
+        # ruff works on UTF-8 bytes: encode once, and skip decoding the
+        # result when nothing changed (the common case for tidy code).
+        code_bytes = code_string.encode("utf-8", "surrogatepass")
+        import subprocess  # only the ruff path runs a subprocess
+        proc = subprocess.run(
+            [RUFF_PATH, "format", "--quiet", "-"],
+            input=code_bytes,
+            capture_output=True,
+            check=False,
+        )
+        if proc.returncode != 0:
+            message = proc.stderr.decode("utf-8", "replace").strip()
+            raise RuntimeError(message or f"ruff exited with status {proc.returncode}")
+        if proc.stdout == code_bytes:
+            return code_string
+        return proc.stdout.decode("utf-8", "surrogatepass")
+    _load_formatter()
+    if FORMATTER == "black":
+        return black.format_str(code_string, mode=black.Mode())
+    # fix_code normalises some option lists in place, so hand it a copy
+    return autopep8.fix_code(code_string, options=copy.copy(_AUTOPEP8_OPTIONS))
+
+
+def _warm_up() -> None:
+    """
+    Prepares the interactive console before its first prompt: the execution
+    worker starts up in the background while the user types, and the
+    formatter is warmed up. Set NOVAMIND_WARMUP=0 to skip this.
+    """
+    if os.environ.get("NOVAMIND_WARMUP", "1") == "0":
+        return
+    _execution_worker.warm_up()
+    _warm_up_formatter()
+
+
+def _warm_up_formatter() -> None:
+    """
+    Runs autopep8 once on a tiny input so its lazy imports and regex
+    compilation happen before the first prompt rather than on the first
+    snippet. ruff and black need no warm-up here.
+    """
+    if FORMATTER == "autopep8":
+        try:
+            _format_code("x = 1\n")
+        except Exception as e:
+            LOG.warning("autopep8 warm-up failed: %s", e)
+
+
+class _ImprovementVisitor(ast.NodeVisitor):
+    """
+    Collects docstring, type hint, loop refactoring and file handling findings
+    in a single traversal of the AST (see visit). Findings for the same key are
+    concatenated in visit order, matching what improve_code_suggestion reports.
+    """
+
+    def __init__(self, handlers: Optional[Dict[type, Any]] = None) -> None:
+        # Node type -> handler; defaults to all checks (see _handlers_for).
+        # Copied, since handlers retire themselves once their answer is known.
+        self.handlers = dict(_VISIT_HANDLERS if handlers is None else handlers)
+        # Message fragments per key, joined once at the end (see improvements())
+        self.messages: DefaultDict[str, List[str]] = defaultdict(list)
+        self.refactor_found = False
+        # File handling: open() calls outside a with item, and .close() calls
+        self.used_open = False
+        self.used_close = False
+        # ids of open() calls that are with items, seen before the calls themselves
+        self._with_opens: Set[int] = set()
+
+    def _append(self, key: str, message: str) -> None:
+        self.messages[key].append(message)
+
+    def improvements(self) -> Dict[str, str]:
+        """The collected findings, one concatenated message per key."""
+        return {key: "".join(parts) for key, parts in self.messages.items()}
+
+    def _check_function(self, node: ast.AST) -> None:
+        # Check for docstring
+        if not _has_docstring(node):
+            self._append(
+                "docstring_suggestion",
+                _FUNCTION_DOCSTRING_TMPL.format(name=node.name))
+
+        # Check for type hints (simplified: just checking for any annotations)
+        if not node.returns and not any(arg.annotation for arg in node.args.args):
+            self._append(
+                "type_hint_suggestion",
+                _TYPE_HINT_TMPL.format(name=node.name))
+
+    visit_FunctionDef = _check_function
+    visit_AsyncFunctionDef = _check_function
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        if not _has_docstring(node):
+            self._append(
+                "class_docstring_suggestion",
+                _CLASS_DOCSTRING_TMPL.format(name=node.name))
+
+    def visit_For(self, node: ast.For) -> None:
+        # This is a very simple heuristic and won't catch all cases.
+        # Exact type tests: AST node classes are never subclassed
+        first = node.body[0]
+        if type(first) is ast.Expr and type(first.value) is ast.Call:
+            func = first.value.func
+            if type(func) is ast.Attribute and func.attr == 'append':
+                self.refactor_found = True  # Only suggest once per code block
+                # Early exit: later loops are still walked, but no longer checked
+                del self.handlers[ast.For]
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if _is_open_call(node):
+            if id(node) not in self._with_opens:
+                self.used_open = True
+        elif type(node.func) is ast.Attribute and node.func.attr == 'close' and not node.args:
+            self.used_close = True
+
+    def visit_With(self, node: ast.AST) -> None:
+        for item in node.items:
+            if _is_open_call(item.context_expr):
+                self._with_opens.add(id(item.context_expr))
+
+    visit_AsyncWith = visit_With
+
+    def visit(self, node: ast.AST) -> None:
+        """
+        Walks the whole tree under node depth-first, in source order, with an
+        explicit stack instead of recursion. Handlers are found by one dict
+        lookup on the exact node type and do not recurse themselves; subtrees
+        that cannot contain anything of interest are not descended into.
+        """
+        handlers = self.handlers
+        if ast.Call not in handlers:
+            # Every remaining handler targets a statement, and statements only
+            # occur in statement lists, so expressions need not be walked
+            self._visit_statements(node)
+            return
+        leaves = _LEAF_TYPES
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            handler = handlers.get(node_type)
+            if handler is not None:
+                handler(self, node)
+            elif node_type in leaves:
+                continue
+            children = list(ast.iter_child_nodes(node))
+            children.reverse()  # so the first child is popped first
+            stack += children
+
+    def _visit_statements(self, node: ast.AST) -> None:
+        # Same walk and order as visit, through statement-list fields only
+        handlers = self.handlers
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            handler = handlers.get(node_type)
+            if handler is not None:
+                handler(self, node)
+            children = []
+            for name in _statement_fields(node_type):
+                children += getattr(node, name)
+            children.reverse()  # so the first child is popped first
+            stack += children
+
+
+# Node type -> _ImprovementVisitor handler, used by _ImprovementVisitor.visit
+_VISIT_HANDLERS = {
+    ast.FunctionDef: _ImprovementVisitor.visit_FunctionDef,
+    ast.AsyncFunctionDef: _ImprovementVisitor.visit_AsyncFunctionDef,
+    ast.ClassDef: _ImprovementVisitor.visit_ClassDef,
+    ast.For: _ImprovementVisitor.visit_For,
+    ast.Call: _ImprovementVisitor.visit_Call,
+    ast.With: _ImprovementVisitor.visit_With,
+    ast.AsyncWith: _ImprovementVisitor.visit_AsyncWith,
+}
+
+# Handlers that only matter if the source mentions the named text
+_APPEND_HANDLER_TYPES = (ast.For,)
+_OPEN_HANDLER_TYPES = (ast.Call, ast.With, ast.AsyncWith)
+
+
+def _handlers_for(code_string: str) -> Dict[type, Any]:
+    """
+    The visitor dispatch table for code_string. A cheap substring scan drops
+    the loop refactoring handlers when "append" never occurs, and the file
+    handling ones when "open" never occurs, since they could not match.
+    """
+    return _handler_table("append" in code_string, "open" in code_string)
+
+
+@functools.lru_cache(maxsize=None)
+def _handler_table(has_append: bool, has_open: bool) -> Dict[type, Any]:
+    handlers = dict(_VISIT_HANDLERS)
+    if not has_append:
+        for node_type in _APPEND_HANDLER_TYPES:
+            del handlers[node_type]
+    if not has_open:
+        for node_type in _OPEN_HANDLER_TYPES:
+            del handlers[node_type]
+    return handlers
+
+
+# Node types whose children never need visiting: names, literals, and the
+# context/operator singletons that iter_child_nodes would otherwise yield.
+_LEAF_TYPES = frozenset(
+    {ast.Name, ast.Constant, ast.alias, ast.Pass, ast.Break, ast.Continue}
+    | {cls for base in (ast.expr_context, ast.boolop, ast.operator, ast.unaryop, ast.cmpop)
+       for cls in base.__subclasses__()}
+)
+
+
+# Fields that hold statement lists (or handlers/cases, whose bodies do)
+_STATEMENT_FIELD_NAMES = frozenset({"body", "orelse", "finalbody", "handlers", "cases"})
+
+
+@functools.lru_cache(maxsize=None)
+def _statement_fields(node_type: type) -> Tuple[str, ...]:
+    """node_type's statement-list fields, in _fields (that is, source) order."""
+    return tuple(name for name in node_type._fields if name in _STATEMENT_FIELD_NAMES)
+
+
+def _has_docstring(node: ast.AST) -> bool:
+    """
+    Same test as bool(ast.get_docstring(node)), minus its Python-level call
+    and inspect.cleandoc pass: the body starts with a non-blank string literal.
+    """
+    body = node.body
+    if not body:
+        return False
+    first = body[0]
+    if not (type(first) is ast.Expr and type(first.value) is ast.Constant):
+        return False
+    text = first.value.value
+    return type(text) is str and not (text == "" or text.isspace())
+
+
+def _is_open_call(node: ast.AST) -> bool:
+    """True for open(...) and for method-style opens such as path.open(...)."""
+    if type(node) is not ast.Call:
+        return False
+    func = node.func
+    func_type = type(func)
+    return (func_type is ast.Name and func.id == 'open') or \
+        (func_type is ast.Attribute and func.attr == 'open')
+
+
+class _Findings(NamedTuple):
+    """What _ImprovementVisitor found in one top-level statement (see _collect_findings)."""
+    messages: Tuple[Tuple[str, Tuple[str, ...]], ...]
+    refactor_found: bool
+    used_open: bool
+    used_close: bool
+
+
+# Findings per top-level statement, keyed by the digest of its source lines
+# (which hold that statement alone; see _collect_findings)
+SEGMENT_CACHE_SIZE = 1024
+_SEGMENT_CACHE = _DigestCache(SEGMENT_CACHE_SIZE)
+
+
+def _collect_findings(code_string: str, tree: ast.AST) -> _ImprovementVisitor:
+    """
+    Runs _ImprovementVisitor over tree, reusing the findings for top-level
+    statements whose source was analysed before, which is most of them when
+    a snippet is edited and resubmitted. Every check looks at one statement
+    at a time, so merging per-statement findings in order gives the same
+    result as one walk over the whole tree. Each statement's segment runs
+    from the end of the previous one, so decorators and comments are
+    included in its key.
+    """
+    # The handler table depends on the whole source (.close() only counts
+    # if "open" occurs anywhere), so it is part of every segment's key
+    flags = ("append" in code_string, "open" in code_string)
+    handlers = _handler_table(*flags)
+    merged = _ImprovementVisitor(handlers)
+    # Line numbers only match a plain "\n" split when there are no bare "\r"s.
+    # Statements sharing a line (a; b) have no segment of their own, so such
+    # trees are walked whole rather than keyed on partial or empty segments.
+    if (type(tree) is not ast.Module or "\r" in code_string
+            or any(stmt.lineno <= prev.end_lineno
+                   for prev, stmt in zip(tree.body, tree.body[1:]))):
+        merged.visit(tree)
+        return merged
+    lines = code_string.split("\n")
+    start = 0
+    for stmt in tree.body:
+        end = stmt.end_lineno
+        segment = "\n".join(lines[start:end])
+        start = end
+        key = _source_key(segment) + bytes(flags)
+        findings = _SEGMENT_CACHE.get(key)
+        if findings is None:
+            visitor = _ImprovementVisitor(handlers)
+            visitor.visit(stmt)
+            findings = _Findings(
+                tuple((k, tuple(parts)) for k, parts in visitor.messages.items()),
+                visitor.refactor_found, visitor.used_open, visitor.used_close)
+            _SEGMENT_CACHE.put(key, findings)
+        for k, parts in findings.messages:
+            merged.messages[k].extend(parts)
+        merged.refactor_found |= findings.refactor_found
+        merged.used_open |= findings.used_open
+        merged.used_close |= findings.used_close
+    return merged
+
+
+def improve_code_suggestion(code_string: str, tree: Optional[ast.AST] = None) -> Dict[str, str]:
     """
     Provides suggestions for improving Python code based on common best practices
     from the knowledge corpus. This function demonstrates a simplified 'code improvement'
     capability, including automated formatting and conceptual suggestions.
 
+    Results are memoized per code string (by digest, in _SUGGEST_CACHE, which
+    is kept on disk between runs; see SUGGEST_CACHE_PATH), so resubmitting the
+    same snippet skips formatting and analysis. Each call returns a fresh dict.
+
     Args:
         code_string (str): The Python code to analyze for improvements.
+        tree (Optional[ast.AST]): An already-parsed AST of code_string, if the
+                                  caller has one; otherwise it is parsed here.
 
     Returns:
         Dict[str, str]: A dictionary of improvement suggestions.
     """
+    global _suggest_cache_dirty
+    if not _suggest_cache_loaded:
+        _load_suggest_cache()
+    key = _source_key(code_string)
+    cached = _SUGGEST_CACHE.get(key)
+    if cached is None:
+        # Stored as a tuple of items, so callers can't mutate the cached copy
+        cached = tuple(_analyse_code(code_string, tree).items())
+        _SUGGEST_CACHE.put(key, cached)
+        _suggest_cache_dirty = True
+    return dict(cached)
+
+
+SUGGEST_CACHE_SIZE = 256
+_SUGGEST_CACHE = _DigestCache(SUGGEST_CACHE_SIZE)
+
+
+def _suggest_cache_path() -> Optional[Path]:
+    """Where _SUGGEST_CACHE is kept between runs; None if NOVAMIND_SUGGEST_CACHE=0."""
+    if os.environ.get("NOVAMIND_SUGGEST_CACHE", "1") == "0":
+        return None
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "novamind" / "suggest_cache.json"
+
+
+SUGGEST_CACHE_PATH = _suggest_cache_path()
+# Read now: run as a script, __main__ loses __file__ before atexit handlers run
+_SCRIPT_PATH = os.path.abspath(__file__)
+_suggest_cache_loaded = False
+_suggest_cache_dirty = False
+
+
+def _suggest_cache_stamp() -> str:
+    """
+    Identifies everything the cached suggestions depend on: this script, the
+    Python version (ast) and the formatter in use, with the modification times
+    of the script and the formatter so that editing or upgrading either one
+    discards the entries saved before.
+    """
+    if FORMATTER == "ruff":
+        formatter_path = RUFF_PATH
+    elif FORMATTER:
+        formatter_path = importlib.util.find_spec(FORMATTER).origin
+    else:
+        formatter_path = None
+    parts = [VERSION, sys.version, str(FORMATTER)]
+    for path in (_SCRIPT_PATH, formatter_path):
+        try:
+            parts.append(f"{path}:{os.stat(path).st_mtime_ns}")
+        except (TypeError, OSError):  # no formatter, or no file behind it
+            parts.append(str(path))
+    return hashlib.blake2b("|".join(parts).encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _load_suggest_cache() -> None:
+    """Fills _SUGGEST_CACHE from SUGGEST_CACHE_PATH on first use; stale or unreadable files are ignored."""
+    global _suggest_cache_loaded
+    _suggest_cache_loaded = True
+    if SUGGEST_CACHE_PATH is None:
+        return
+    import json
+    try:
+        with open(SUGGEST_CACHE_PATH, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("stamp") != _suggest_cache_stamp():
+            return
+        for key, items in saved["entries"]:
+            _SUGGEST_CACHE.put(bytes.fromhex(key), tuple(tuple(item) for item in items))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        if not isinstance(e, FileNotFoundError):
+            LOG.warning("Ignoring the suggestion cache %s: %s", SUGGEST_CACHE_PATH, e)
+
+
+def _save_suggest_cache() -> None:
+    """Writes _SUGGEST_CACHE back at exit if this run added to it (atomically, via a temporary file)."""
+    if not _suggest_cache_dirty or SUGGEST_CACHE_PATH is None:
+        return
+    import json
+    saved = {
+        "stamp": _suggest_cache_stamp(),
+        "entries": [[key.hex(), items] for key, items in _SUGGEST_CACHE.items()],
+    }
+    tmp_path = SUGGEST_CACHE_PATH.with_name(f"{SUGGEST_CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        SUGGEST_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, SUGGEST_CACHE_PATH)
+    except OSError as e:
+        LOG.warning("Could not save the suggestion cache %s: %s", SUGGEST_CACHE_PATH, e)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+atexit.register(_save_suggest_cache)
+
+
+def _analyse_code(code_string: str, tree: Optional[ast.AST]) -> Dict[str, str]:
+    """Computes the suggestions returned by improve_code_suggestion, without caching."""
     improvements = {}
 
+    # Parse first: code that does not parse is neither formatted nor analysed
+    if tree is None:
+        tree = _parse_cached(code_string)
+
     # 1. Automated Formatting (PEP 8 compliance)
-    if AUTOPEP8_AVAILABLE:
+    if tree is None:
+        improvements["formatting_suggestion"] = _FORMAT_SKIPPED
+    elif FORMATTER:
         try:
-            # autopep8.fix_code applies PEP 8 formatting
-            formatted_code = autopep8.fix_code(code_string)
+            formatted_code = _format_code(code_string)
             if formatted_code != code_string:
                 improvements["formatted_code"] = formatted_code
-                improvements["formatting_suggestion"] = "Code has been automatically formatted for **PEP 8 compliance** using autopep8. Consistent formatting improves readability."
+                improvements["formatting_suggestion"] = _FORMAT_APPLIED
             else:
-                improvements[
-                    "formatting_suggestion"] = "Code already appears to be PEP 8 compliant (no changes by autopep8)."
+                improvements["formatting_suggestion"] = _FORMAT_UNCHANGED
         except Exception as e:
             improvements[
                 "formatting_suggestion"] = f"Could not apply automatic formatting: {e}"
-            logging.warning(f"Autopep8 failed: {e}")
+            LOG.warning("%s failed: %s", FORMATTER, e)
     else:
-        improvements["formatting_suggestion"] = (
-            "autopep8 is not installed. Install it for automatic PEP 8 formatting suggestions."
-        )
+        improvements["formatting_suggestion"] = _NO_FORMATTER
 
     # Use AST (Abstract Syntax Tree) for more structural analysis
-    try:
-        tree = ast.parse(code_string)
-
-        # 2. Docstring/Type Hinting Suggestion
-        # Check for functions without docstrings or type hints
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Check for docstring
-                if not ast.get_docstring(node):
-                    improvements["docstring_suggestion"] = improvements.get("docstring_suggestion", "") + \
-                        f"Consider adding a **docstring** to function {node.name} to explain its purpose, arguments, and return values (e.g., using Google or NumPy style)."
-
-                # Check for type hints (simplified: just checking for any annotations)
-                if not node.returns and not any(arg.annotation for arg in node.args.args):
-                    improvements["type_hint_suggestion"] = improvements.get("type_hint_suggestion", "") + \
-                        f"Add **type hints** to parameters and the return value of function {node.name} for better readability and static analysis."
-            elif isinstance(node, ast.ClassDef):
-                if not ast.get_docstring(node):
-                    improvements["class_docstring_suggestion"] = improvements.get("class_docstring_suggestion", "") + \
-                        f"Consider adding a **docstring** to class {node.name} to explain its purpose."
-
-        # 3. Basic Refactoring Suggestion (e.g., list comprehension for simple loops)
-        # This is a very simple heuristic and won't catch all cases.
-        for node in ast.walk(tree):
-            if isinstance(node, ast.For):
-                if isinstance(node.body[0], ast.Expr) and isinstance(node.body[0].value, ast.Call):
-                    if isinstance(node.body[0].value.func, ast.Attribute) and node.body[0].value.func.attr == 'append':
-                        improvements["refactoring_suggestion"] = improvements.get("refactoring_suggestion", "") + \
-                            "If you are building a list using a for loop and .append(), consider using a more concise **list comprehension** for better readability and often performance."
-                        break  # Only suggest once per code block
-
-        # 4. File Handling Suggestion (using 'with' statement)
-        if "open(" in code_string and ".close()" in code_string and "with open" not in code_string:
-            improvements["file_handling_suggestion"] = "When working with files, always use a with open(...) statement. It ensures the file is properly closed even if errors occur, preventing resource leaks."
+    if tree is None:
+        improvements["analysis_warning"] = _SYNTAX_WARNING
+    else:
+        try:
+            # 2. Docstring/Type Hinting Suggestion and
+            # 3. Basic Refactoring Suggestion (e.g., list comprehension for simple loops)
+            # Both are collected by one visitor pass, reused per statement.
+            visitor = _collect_findings(code_string, tree)
+            improvements.update(visitor.improvements())
 
-    except SyntaxError:
-        improvements["analysis_warning"] = "Could not perform deeper code analysis due to syntax errors. Please fix syntax first."
-    except Exception as e:
-        improvements["analysis_warning"] = f"An error occurred during code analysis: {e}"
-        logging.warning(f"AST analysis failed: {e}")
+            # Added after the walk so it keeps its place after the docstring hints
+            if visitor.refactor_found:
+                improvements["refactoring_suggestion"] = _REFACTORING_SUGGESTION
+
+            # 4. File Handling Suggestion (using 'with' statement), from the same walk
+            if visitor.used_open and visitor.used_close:
+                improvements["file_handling_suggestion"] = _FILE_HANDLING_SUGGESTION
+
+        except Exception as e:
+            improvements["analysis_warning"] = f"An error occurred during code analysis: {e}"
+            LOG.warning("AST analysis failed: %s", e)
 
     # 5. Dependency Management Reminder (always relevant)
-    improvements["dependency_reminder"] = "Remember to manage your project dependencies using a requirements.txt file or a tool like poetry or pipenv. Always install dependencies in a **virtual environment** to avoid conflicts."
+    improvements["dependency_reminder"] = _DEPENDENCY_REMINDER
 
     # 6. General Best Practices Reminder (always relevant)
-    improvements["general_best_practices"] = """
-    **General Best Practices Reminders:**
-    * **Modular Structure:** Break code into smaller, reusable functions and classes (**DRY Principle**).
-    * **Descriptive Naming:** Use clear and meaningful names for all identifiers.
-    * **Error Handling:** Use try-except blocks for graceful error management.
-    * **Testing:** Write unit tests (pytest, unittest) and aim for good test coverage (coverage.py).
-    * **Security:** Regularly scan for vulnerabilities (bandit, safety).
-    * **Performance:** Profile your code (cProfile) and optimize algorithms/data structures.
-    * **Documentation:** Maintain clear **docstrings** and **READMEs** for your projects.
-    """
+    improvements["general_best_practices"] = _GENERAL_BEST_PRACTICES
 
     return improvements
 
 
-def main() -> None:
+# Shown instead of improvement suggestions for code that does not compile
+_SKIP_IMPROVEMENTS = "Fix the syntax errors first; skipping improvement analysis."
+
+# Lines that open and close a paste block, which may contain blank lines
+_PASTE_START = "<<EOF"
+_PASTE_END = "EOF"
+
+
+def _iter_input_lines() -> Iterator[str]:
     """
-    Main function to demonstrate Python code interpretation, error correction, and improvement.
-    This acts as a basic interactive console for the AI's capabilities.
+    Yields console input line by line, without line endings. Piped (non-TTY)
+    stdin is read in a single call; a terminal is read with readline() on
+    the stream directly, which is cheaper than input() per line.
     """
-    parser = argparse.ArgumentParser(
-        description="Interactive Python Code Assistant")
-    parser.add_argument(
-        "--file",
-        "-f",
-        type=str,
-        help="Run code from the specified file instead of starting the interactive console.",
-    )
-    parser.add_argument(
-        "--format",
-        action="store_true",
-        help="Format the provided file using autopep8 and output the result",
-    )
-    parser.add_argument(
-        "--version",
-        action="version",
-        version=f"Python Code Assistant {VERSION}",
-    )
-    args = parser.parse_args()
+    if sys.stdin is None:
+        return
+    if not sys.stdin.isatty():
+        yield from sys.stdin.read().splitlines()
+        return
+    for line in iter(sys.stdin.readline, ""):
+        yield line[:-1] if line.endswith("\n") else line
 
-    if args.file:
-        try:
-            with open(args.file, "r", encoding="utf-8") as f:
-                code = f.read()
-        except OSError as exc:
-            print(f"Failed to read file: {exc}")
-            return
 
-        if args.format:
-            if AUTOPEP8_AVAILABLE:
-                print(autopep8.fix_code(code))
-            else:
-                print("autopep8 is not installed; cannot format code")
+def _read_snippet(lines: Iterator[str]) -> Optional[str]:
+    """
+    Collects the next snippet from lines: everything up to an empty line, or
+    a whole paste block. Returns None once the input is exhausted; a final
+    snippet without a closing empty line is still returned.
+    """
+    # Lines are streamed into one buffer, each followed by "\n"; the final
+    # newline is dropped on the way out
+    buf = io.StringIO()
+    for line in lines:
+        if not buf.tell() and line.strip() == _PASTE_START:
+            for pasted in lines:
+                if pasted.strip() == _PASTE_END:
+                    break
+                buf.write(pasted)
+                buf.write("\n")
+            return buf.getvalue()[:-1]
+        if not line:  # Empty line signals end of input
+            return buf.getvalue()[:-1]
+        buf.write(line)
+        buf.write("\n")
+    return buf.getvalue()[:-1] if buf.tell() else None
+
+
+def _label(key: str) -> str:
+    """Display form of a result key or status: "type_hint_suggestion" -> "Type Hint Suggestion"."""
+    return key.replace('_', ' ').title()
+
+
+# Labels for every status and suggestion key the assistant produces, made once
+_LABELS: Final[Dict[str, str]] = {key: _label(key) for key in (
+    "success", "syntax_error", "runtime_error", "timeout",
+    "formatting_suggestion", "docstring_suggestion", "type_hint_suggestion",
+    "class_docstring_suggestion", "refactoring_suggestion",
+    "file_handling_suggestion", "analysis_warning", "dependency_reminder",
+    "general_best_practices",
+)}
+
+
+def _print_report(execution_result: Dict[str, Any],
+                  improvement_suggestions: Optional[Dict[str, str]],
+                  trailer: Optional[str] = None) -> None:
+    """
+    Prints the execution result, error correction and improvement suggestions
+    (None if skipped, see _SKIP_IMPROVEMENTS), then trailer if given. The
+    report is built as a list of lines and written in one call.
+    """
+    status = execution_result["status"]
+    out = [f"**Execution Status:** {_LABELS.get(status) or _label(status)}"]
+    if execution_result["output"]:
+        out.append("\n--- Captured Output (stdout) ---")
+        out.append(execution_result["output"].strip())
+    if execution_result["error"]:
+        out.append("\n--- Captured Error (stderr) ---")
+        out.append(execution_result["error"].strip())
+
+    out.append("\n--- Error Correction Suggestions ---")
+    out.append(error_correct_code_suggestion(execution_result))
+
+    out.append("\n--- Code Improvement Suggestions ---")
+    if improvement_suggestions is None:
+        out.append(_SKIP_IMPROVEMENTS)
+    else:
+        # Display formatted code if available
+        formatted = improvement_suggestions.get("formatted_code")
+        if formatted is not None:
+            out.append("\n**Suggested Formatted Code:**")
+            out.append("```python")
+            out.append(formatted)
+            out.append("```")
+
+        # Display other improvement suggestions, all rows built in one pass;
+        # the caller's dict is left as is (formatted_code is shown above)
+        out += [f"- **{_LABELS.get(key) or _label(key)}:** {value}"
+                for key, value in improvement_suggestions.items()
+                if key != "formatted_code"]
+
+    if trailer is not None:
+        out.append(trailer)
+    out.append("")  # so the report ends with a newline, as print() would
+    sys.stdout.write("\n".join(out))
+
+
+def _run_file(code: str, format_only: bool,
+              analysed: Optional[Iterator[Tuple[Tuple[str, str], ...]]] = None) -> None:
+    """
+    Runs and analyses code read from --file, or only formats it with --format.
+    analysed, if given, yields this file's suggestions (see _run_files)
+    instead of them being worked out here.
+    """
+    if format_only:
+        if not FORMATTER:
+            print("No formatter (ruff, black or autopep8) is installed; cannot format code")
             return
+        try:
+            print(_format_code(code))
+        except Exception as exc:
+            print(f"Could not format code: {exc}")
+        return
 
-        execution_result = interpret_and_execute_code(code)
-        print(
-            f"**Execution Status:** {execution_result['status'].replace('_', ' ').title()}")
-        if execution_result["output"]:
-            print("\n--- Captured Output (stdout) ---")
-            print(execution_result["output"].strip())
-        if execution_result["error"]:
-            print("\n--- Captured Error (stderr) ---")
-            print(execution_result["error"].strip())
-
-        print("\n--- Error Correction Suggestions ---")
-        print(error_correct_code_suggestion(execution_result))
-
-        print("\n--- Code Improvement Suggestions ---")
-        improvement_suggestions = improve_code_suggestion(code)
-        if "formatted_code" in improvement_suggestions:
-            print("\n**Suggested Formatted Code:**")
-            print("```python")
-            print(improvement_suggestions["formatted_code"])
-            print("```")
-            del improvement_suggestions["formatted_code"]
-        for key, value in improvement_suggestions.items():
-            print(f"- **{key.replace('_', ' ').title()}:** {value}")
+    # Parse once: the tree is compiled for the worker and reused for the
+    # analysis. Code with syntax errors is sent as source so the worker
+    # reports the error, and gets no improvement analysis.
+    tree = _parse_cached(code)
+    # Analyse the code while the worker process runs it
+    submit_code_execution(code, tree)
+    improvement_suggestions = None
+    if tree is not None:
+        if analysed is None:
+            improvement_suggestions = improve_code_suggestion(code, tree)
+        else:
+            improvement_suggestions = dict(next(analysed))
+    execution_result = collect_code_execution()
+    if execution_result["status"] == "syntax_error":
+        improvement_suggestions = None
+    _print_report(execution_result, improvement_suggestions)
+
+
+def _analyse_for_pool(code_string: str) -> Tuple[Tuple[str, str], ...]:
+    """Process pool task: the uncached improve_code_suggestion analysis, as items."""
+    return tuple(_analyse_code(code_string, None).items())
+
+
+def _run_files(files: List[Tuple[str, str]], format_only: bool) -> None:
+    """
+    Runs _run_file for each (name, code) in files, under a header per file.
+    Snippets still execute one at a time in the execution worker, but when
+    several files need analysing the analyses run in a process pool, in
+    parallel with each other and with the executions.
+    """
+    if len(files) == 1:
+        _run_file(files[0][1], format_only)
         return
+    # Which files get their suggestions from the pool: those that parse and
+    # are not cached yet, each distinct source once. Decided up front, so
+    # pool results are matched to files by order alone.
+    from_pool = [False] * len(files)
+    misses = []
+    if not format_only:
+        if not _suggest_cache_loaded:
+            _load_suggest_cache()
+        seen = set()
+        for index, (_, code) in enumerate(files):
+            key = _source_key(code)
+            if (key not in seen and _parse_cached(code) is not None
+                    and _SUGGEST_CACHE.get(key) is None):
+                seen.add(key)
+                misses.append(code)
+                from_pool[index] = True
+    pool = None
+    if len(misses) > 1:
+        import multiprocessing
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.Pool(min(len(misses), os.cpu_count() or 1))
+    try:
+        pooled = pool.imap(_analyse_for_pool, misses) if pool is not None else None
+        for index, (name, code) in enumerate(files):
+            if index:
+                print()  # a blank line between one file's report and the next header
+            print(f"=== {name} ===")
+            analysed = None
+            if pooled is not None and from_pool[index]:
+                analysed = _cached_pool_result(code, pooled)
+            _run_file(code, format_only, analysed)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def _cached_pool_result(code_string: str, pooled: Iterator[Tuple[Tuple[str, str], ...]]
+                        ) -> Iterator[Tuple[Tuple[str, str], ...]]:
+    # Yields the next pool result, which belongs to code_string, once it is
+    # needed; it is cached (and saved at exit) like any other analysis
+    global _suggest_cache_dirty
+    items = next(pooled)
+    _SUGGEST_CACHE.put(_source_key(code_string), items)
+    _suggest_cache_dirty = True
+    yield items
+
 
+def _interactive() -> None:
+    """Runs the interactive console until quit() or end of input."""
     print("Welcome to the Python Code Assistant!")
     print("This tool can interpret, error-correct, and suggest improvements for your Python code.")
     print("---")
     print("To use, enter your Python code. For multi-line input, press Enter on an empty line to submit.")
+    print(f"To paste code containing blank lines, start with a {_PASTE_START} line and end with an {_PASTE_END} line.")
     print("Type 'quit()' to exit the assistant.")
     print("---")
 
+    lines = _iter_input_lines()
     while True:
         print("\nEnter your Python code:")
-        code_lines = []
-        while True:
-            try:
-                line = input()
-                if not line:  # Empty line signals end of input
-                    break
-                code_lines.append(line)
-            except EOFError:  # Handle Ctrl+D (Unix) or Ctrl+Z (Windows)
-                print("\nEOF detected. Exiting Python Code Assistant. Goodbye!")
-                return
-
-        user_code = "\n".join(code_lines)
+        user_code = _read_snippet(lines)
+        if user_code is None:  # Handle Ctrl+D (Unix) or Ctrl+Z (Windows)
+            print("\nEOF detected. Exiting Python Code Assistant. Goodbye!")
+            return
 
         if user_code.strip().lower() == "quit()":
             print("Exiting Python Code Assistant. Goodbye!")
@@ -717,37 +1505,69 @@ def main() -> None:
             continue
 
         print("\n--- Interpreting and Executing Code ---")
-        execution_result = interpret_and_execute_code(user_code)
+        # Analyse the code while the worker process runs it, sharing one parse
+        # between the two; code with syntax errors gets no improvement analysis
+        # (see _SKIP_IMPROVEMENTS)
+        tree = _parse_cached(user_code)
+        submit_code_execution(user_code, tree)
+        improvement_suggestions = None
+        if tree is not None:
+            improvement_suggestions = improve_code_suggestion(user_code, tree)
+        execution_result = collect_code_execution()
+        if execution_result["status"] == "syntax_error":
+            improvement_suggestions = None
 
-        print(
-            f"**Execution Status:** {execution_result['status'].replace('_', ' ').title()}")
-        if execution_result["output"]:
-            print("\n--- Captured Output (stdout) ---")
-            print(execution_result["output"].strip())
-        if execution_result["error"]:
-            print("\n--- Captured Error (stderr) ---")
-            print(execution_result["error"].strip())
+        _print_report(execution_result, improvement_suggestions, "\n--- End of Analysis ---")
 
-        print("\n--- Error Correction Suggestions ---")
-        print(error_correct_code_suggestion(execution_result))
 
-        print("\n--- Code Improvement Suggestions ---")
-        improvement_suggestions = improve_code_suggestion(user_code)
+def main() -> None:
+    """
+    Main function to demonstrate Python code interpretation, error correction, and improvement.
+    This acts as a basic interactive console for the AI's capabilities.
+    """
+    if len(sys.argv) == 1:
+        # Plain launch: the interactive console needs no argument parsing
+        _warm_up()
+        _interactive()
+        return
 
-        # Display formatted code if available
-        if "formatted_code" in improvement_suggestions:
-            print("\n**Suggested Formatted Code:**")
-            print("```python")
-            print(improvement_suggestions["formatted_code"])
-            print("```")
-            # Remove to avoid printing it again in the list
-            del improvement_suggestions["formatted_code"]
-
-        # Display other improvement suggestions
-        for key, value in improvement_suggestions.items():
-            print(f"- **{key.replace('_', ' ').title()}:** {value}")
-
-        print("\n--- End of Analysis ---")
+    import argparse  # only needed, and only imported, when there are arguments
+    parser = argparse.ArgumentParser(
+        description="Interactive Python Code Assistant")
+    parser.add_argument(
+        "--file",
+        "-f",
+        nargs="+",
+        type=str,
+        help="Run code from the specified file(s) instead of starting the interactive console.",
+    )
+    parser.add_argument(
+        "--format",
+        action="store_true",
+        help="Format the provided file(s) (using ruff, black or autopep8) and output the result",
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"Python Code Assistant {VERSION}",
+    )
+    args = parser.parse_args()
+
+    if args.file:
+        # The files are run straight away: starting the worker early would gain nothing
+        files = []
+        for path in args.file:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    files.append((path, f.read()))
+            except OSError as exc:
+                print(f"Failed to read file: {exc}")
+                return
+        _run_files(files, args.format)
+        return
+
+    _warm_up()
+    _interactive()
 
 
 if __name__ == "__main__":
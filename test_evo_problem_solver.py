@@ -0,0 +1,33 @@
+import importlib.util
+import sys
+import unittest
+
+# Importing the solver runs its dependency bootstrap; only do that where
+# its mandatory imports are already installed
+if importlib.util.find_spec("autopep8") and importlib.util.find_spec("isort"):
+    import evo_problem_solver as evo
+else:
+    evo = None
+
+_UPPER = [sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"]
+_FAIL = [sys.executable, "-c", "import sys; sys.stdin.read(); sys.exit(1)"]
+_MISSING = ["novamind-no-such-tool"]
+
+
+@unittest.skipIf(evo is None, "autopep8 and isort are required")
+class PipeTransformTest(unittest.TestCase):
+    def test_failed_stage_passes_its_input_on(self):
+        self.assertEqual(evo._pipe_transform("x = 1\n", [_FAIL, _UPPER]), "X = 1\n")
+
+    def test_missing_stage_is_skipped(self):
+        self.assertEqual(evo._pipe_transform("x = 1\n", [_MISSING, _UPPER]), "X = 1\n")
+
+    def test_later_failure_keeps_earlier_fixes(self):
+        self.assertEqual(evo._pipe_transform("x = 1\n", [_UPPER, _FAIL]), "X = 1\n")
+
+    def test_all_stages_failing_returns_the_code(self):
+        self.assertEqual(evo._pipe_transform("x = 1\n", [_FAIL, _MISSING]), "x = 1\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
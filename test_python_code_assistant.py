@@ -0,0 +1,57 @@
+import os
+import time
+import unittest
+
+# Keep the suggestion cache in memory only, so runs don't read or write ~/.cache
+os.environ["NOVAMIND_SUGGEST_CACHE"] = "0"
+
+import python_code_assistant as pca
+
+
+class CollectFindingsTest(unittest.TestCase):
+    def test_statements_sharing_a_line_do_not_leak_findings(self):
+        # The second statement of each snippet starts on the line the first
+        # one ends on; its findings must not be keyed on an empty segment
+        pca.improve_code_suggestion("x = (1,\n 2); f = open('a')")
+        suggestions = pca.improve_code_suggestion(
+            "y = (3,\n 4); z = 5\nprint('open')\nq.close()\n")
+        self.assertNotIn("file_handling_suggestion", suggestions)
+
+    def test_statements_sharing_a_line_are_still_analysed(self):
+        suggestions = pca.improve_code_suggestion("a = 1; f = open('b'); f.close()\n")
+        self.assertIn("file_handling_suggestion", suggestions)
+
+
+class IsPureTest(unittest.TestCase):
+    def test_routes_to_builtins_are_impure(self):
+        for code in ("__builtins__['open']('/tmp/cnt.txt').read()",
+                     "getattr(x, '__class__')",
+                     "'{0.__class__}'.format(1)"):
+            with self.subTest(code=code):
+                self.assertFalse(pca._is_pure(code))
+
+    def test_plain_computation_is_pure(self):
+        self.assertTrue(pca._is_pure("x = [1]\nx.append(2)\nprint(x)"))
+
+
+class ExecuteHereTest(unittest.TestCase):
+    def test_result_keeps_the_raw_captured_text(self):
+        result = pca._execute_here("import sys\nprint('  x')\nprint(' e', file=sys.stderr)")
+        self.assertEqual(result["output"], "  x\n")
+        self.assertEqual(result["error"], " e\n")
+
+
+@unittest.skipUnless(pca._fd_capture_supported(), "needs descriptor-level capture")
+class FdCaptureTest(unittest.TestCase):
+    def test_leftover_subprocess_does_not_hold_up_the_result(self):
+        # The child inherits the capture pipes and keeps them open for 30 s
+        start = time.monotonic()
+        result = pca._execute_here(
+            "import subprocess; subprocess.Popen(['sleep', '30']); print('done')")
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["output"], "done\n")
+
+
+if __name__ == "__main__":
+    unittest.main()